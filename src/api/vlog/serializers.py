@@ -1,5 +1,9 @@
+from datetime import datetime
+
+import numpy as np
 from rest_framework import serializers
 
+from vlog.fields import HEX_PATTERN, validate_hex
 from vlog.models import Vlog
 
 
@@ -9,6 +13,68 @@ class VlogListSerializer(serializers.ListSerializer):
         return Vlog.objects.bulk_create(data)
 
 
+class FastVlogListSerializer(VlogListSerializer):
+    """
+    Validates a bulk of parsed V-Log lines (see vlog.parsers.parse_vlog_line)
+    column by column, instead of running the field validation for each line.
+    The errors are reported per line, like the regular list serializer does.
+    Data that is not a list of parsed lines is validated the regular way.
+    """
+
+    def to_internal_value(self, data):
+        try:
+            errors = self.validate_columns(data)
+        except (AttributeError, KeyError, TypeError, ValueError, OverflowError):
+            return super().to_internal_value(data)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return data
+
+    def validate_columns(self, data):
+        fields = self.child.fields
+        errors = [{} for _ in data]
+
+        def add_errors(name, mask, message):
+            for index in np.flatnonzero(mask):
+                errors[index].setdefault(name, []).append(message)
+
+        if not all(
+            isinstance(item['time'], datetime) and isinstance(item['message'], str)
+            for item in data
+        ):
+            raise TypeError('Expected parsed V-Log lines')
+
+        for name in ['vri_id', 'message_type']:
+            field = fields[name]
+            values = np.fromiter(
+                (item[name] for item in data), dtype=np.int64, count=len(data)
+            )
+            for limit, mask in [
+                ('min_value', values < field.min_value),
+                ('max_value', values > field.max_value),
+            ]:
+                message = field.error_messages[limit].format(
+                    **{limit: getattr(field, limit)}
+                )
+                add_errors(name, mask, message)
+
+        field = fields['message']
+        lengths = np.fromiter(
+            (len(item['message']) for item in data), dtype=np.int64, count=len(data)
+        )
+        if not field.allow_blank:
+            add_errors('message', lengths == 0, field.error_messages['blank'])
+        add_errors(
+            'message',
+            [not HEX_PATTERN.match(item['message']) for item in data],
+            validate_hex.message,
+        )
+        message = field.error_messages['max_length'].format(max_length=field.max_length)
+        add_errors('message', lengths > field.max_length, message)
+        return errors
+
+
 class VlogSerializer(serializers.ModelSerializer):
     class Meta:
         model = Vlog
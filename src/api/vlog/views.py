@@ -1,13 +1,32 @@
+from collections.abc import Iterator
+from itertools import count
+from typing import Iterable, List
+
+from django.conf import settings
+from django.db import transaction
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from contrib.concurrent.futures import map_in_processes
+from contrib.rest_framework.parsers import PlainTextLineParser, PlainTextParser
+from vlog.columnar import parse_vlog_columns, vlog_columns_from_rows
+from vlog.decoders import store_decoded_messages
 from vlog.models import Vlog
-from vlog.parsers import parse_vlog_lines
+from vlog.parsers import chunked, parse_vlog_chunk
+from vlog.spool import spool_body
+from vlog.writers import (
+    COLUMNAR_ENGINE,
+    WRITE_ENGINES,
+    WriteResult,
+    bulk_create_vlogs,
+    copy_vlog_columns,
+)
 
-from .serializers import VlogSerializer
+from .serializers import FastVlogListSerializer, VlogSerializer
 
 
 class VlogViewSet(viewsets.ModelViewSet):
@@ -19,26 +38,161 @@ class VlogViewSet(viewsets.ModelViewSet):
     queryset = Vlog.objects.all()
     permission_classes = [IsAuthenticated]
 
+    def get_parsers(self):
+        """
+        When streaming is enabled, plain text bodies are parsed lazily
+        into lines instead of being read into memory at once.
+        """
+        parsers = super().get_parsers()
+        if settings.VLOG_STREAMING:
+            parsers = [
+                PlainTextLineParser() if type(parser) is PlainTextParser else parser
+                for parser in parsers
+            ]
+        return parsers
+
     def create(self, request: Request, **kwargs):
+        # In spool mode, plain text bodies are written to disk as they are and
+        # stored later by the `drain_vlog_spool` management command.
+        if settings.VLOG_SPOOL_DIR and request.content_type.startswith(
+            PlainTextParser.media_type
+        ):
+            if request.stream is not None:
+                spool_body(request.stream, settings.VLOG_SPOOL_DIR)
+            return Response("", status=status.HTTP_202_ACCEPTED)
+
         # If we receive a string of data we expect it to be
         # a bulk of V-log messages
         data = request.data
-        many = False
         if isinstance(data, bytes):
-            data = parse_vlog_lines(data.decode())
-            many = True
+            lines = data.decode().splitlines()
+            if settings.VLOG_PARSE_WORKERS > 1:
+                result = self.perform_chunked_bulk_create(lines)
+            else:
+                result = self.perform_bulk_create(lines)
+            return Response(result._asdict(), status=status.HTTP_201_CREATED)
 
-            serializer = self.get_serializer(data=data, many=many)
+        # A lazily parsed body is stored in chunks of VLOG_CHUNK_SIZE lines, so
+        # the memory used does not depend on the size of the body.
+        if isinstance(data, Iterator):
+            result = self.perform_chunked_bulk_create(data)
+            return Response(result._asdict(), status=status.HTTP_201_CREATED)
+
+        # A list of lines is stored like a bulk of V-log messages
+        if isinstance(data, list):
+            serializer = self.get_bulk_serializer(data=data)
             serializer.is_valid(raise_exception=True)
-            self.perform_create(serializer)
-            headers = self.get_success_headers(serializer.data)
-            return Response(
-                "",
-                status=status.HTTP_201_CREATED,
-                headers=headers,
+            result = bulk_create_vlogs(serializer.validated_data)
+            return Response(result._asdict(), status=status.HTTP_201_CREATED)
+
+        # A single line is inserted like a bulk, so a line that is already
+        # stored is skipped instead of violating the unique constraint
+        serializer = self.get_serializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        bulk_create_vlogs([serializer.validated_data])
+        headers = self.get_success_headers(serializer.data)
+        return Response(
+            serializer.data, status=status.HTTP_201_CREATED, headers=headers
+        )
+
+    def get_write_engine(self) -> str:
+        """
+        The engine used to store bulks of V-log lines, either requested
+        with the `engine` query parameter or configured in the settings.
+        """
+        name = self.request.query_params.get('engine', settings.VLOG_WRITE_ENGINE)
+        choices = [*WRITE_ENGINES, COLUMNAR_ENGINE]
+        if name not in choices:
+            choices = ', '.join(choices)
+            raise ValidationError({'engine': [f'"{name}" is not one of: {choices}']})
+        return name
+
+    def get_bulk_serializer(self, data):
+        """
+        The serializer used to validate a bulk of parsed V-log lines.
+        """
+        if settings.VLOG_FAST_VALIDATION:
+            return FastVlogListSerializer(
+                child=self.get_serializer(),
+                data=data,
+                context=self.get_serializer_context(),
+            )
+        return self.get_serializer(data=data, many=True)
+
+    def get_chunk_parser(self, engine: str):
+        """
+        The function that parses a chunk of V-log lines for the engine.
+        """
+        return parse_vlog_columns if engine == COLUMNAR_ENGINE else parse_vlog_chunk
+
+    def store_chunk(self, parsed, engine: str) -> WriteResult:
+        """
+        Validate and store a chunk of V-log lines parsed for the engine, and
+        the decoded messages when VLOG_DECODE_MESSAGES is enabled.
+        """
+        if engine == COLUMNAR_ENGINE:
+            if parsed.errors:
+                raise ValidationError(parsed.errors)
+            result = copy_vlog_columns(parsed)
+        else:
+            serializer = self.get_bulk_serializer(data=parsed)
+            serializer.is_valid(raise_exception=True)
+            result = WRITE_ENGINES[engine](serializer.validated_data)
+
+        if settings.VLOG_DECODE_MESSAGES:
+            if engine != COLUMNAR_ENGINE:
+                parsed = vlog_columns_from_rows(serializer.validated_data)
+            store_decoded_messages(parsed)
+        return result
+
+    def perform_bulk_create(self, lines: List[str], start=1) -> WriteResult:
+        """
+        Parse, validate and store a bulk of V-log lines. Lines that are
+        already stored are skipped and counted as duplicates.
+
+        The columnar engine parses and stores the lines as arrays, the other
+        engines store the lines validated by the serializer. The created
+        lines are not serialized again.
+        """
+        engine = self.get_write_engine()
+        parsed = self.get_chunk_parser(engine)(lines, start)
+        return self.store_chunk(parsed, engine)
+
+    def perform_chunked_bulk_create(self, lines: Iterable[str]) -> WriteResult:
+        """
+        Parse, validate and store V-log lines in chunks of VLOG_CHUNK_SIZE
+        lines. All chunks are stored in one transaction, an invalid chunk
+        rejects all lines.
+
+        With VLOG_PARSE_WORKERS > 1 the chunks are parsed in a pool of
+        processes, while the chunks parsed before are being stored.
+        """
+        engine = self.get_write_engine()
+        parse = self.get_chunk_parser(engine)
+        size = settings.VLOG_CHUNK_SIZE
+        chunks = chunked(lines, size)
+        starts = count(1, size)
+        if settings.VLOG_PARSE_WORKERS > 1:
+            parsed_chunks = map_in_processes(
+                parse, chunks, starts, workers=settings.VLOG_PARSE_WORKERS
             )
+        else:
+            parsed_chunks = map(parse, chunks, starts)
 
-        return super().create(request)
+        created = duplicates = 0
+        try:
+            with transaction.atomic():
+                for parsed in parsed_chunks:
+                    result = self.store_chunk(parsed, engine)
+                    created += result.created
+                    duplicates += result.duplicates
+        finally:
+            # When a chunk fails, cancel the chunks that are being parsed and
+            # stop reading the body
+            for iterator in (parsed_chunks, chunks, lines):
+                if hasattr(iterator, 'close'):
+                    iterator.close()
+        return WriteResult(created=created, duplicates=duplicates)
 
     @action(methods=["GET"], detail=False)
     def env(self, request: Request, **kwargs):
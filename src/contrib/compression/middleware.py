@@ -0,0 +1,141 @@
+import gzip
+import io
+import zlib
+
+import zstandard
+from django.conf import settings
+from django.core.exceptions import BadRequest, RequestDataTooBig
+from django.http import HttpResponse
+
+
+class ZstdReader:
+    """
+    Decompresses a stream of zstd frames while it is read. Unlike
+    ZstdDecompressor.stream_reader, a stream that ends within a frame
+    raises an EOFError, like gzip.GzipFile does for a truncated stream.
+    """
+
+    # The compressed stream is decompressed in small pieces, which bounds
+    # the data decompressed at once from a highly compressed body.
+    read_size = 1024
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.decompressor = zstandard.ZstdDecompressor()
+        self.decompressobj = None
+        self.buffer = b''
+        self.offset = 0
+
+    def read(self, size: int) -> bytes:
+        while self.offset == len(self.buffer):
+            data = self.stream.read(self.read_size)
+            if not data:
+                if self.decompressobj is not None and not self.decompressobj.eof:
+                    raise EOFError('Compressed stream ended before the end of a frame')
+                return b''
+
+            self.buffer, self.offset = b'', 0
+            while data:
+                if self.decompressobj is None or self.decompressobj.eof:
+                    self.decompressobj = self.decompressor.decompressobj()
+                self.buffer += self.decompressobj.decompress(data)
+                # The start of the next frame, if any
+                data = self.decompressobj.unused_data if self.decompressobj.eof else b''
+
+        data = self.buffer[self.offset : self.offset + size]
+        self.offset += len(data)
+        return data
+
+
+# Functions that wrap a compressed stream in a stream of decompressed data,
+# per Content-Encoding. Both decompress lazily while the stream is read.
+DECOMPRESSORS = {
+    'gzip': lambda stream: gzip.GzipFile(fileobj=stream, mode='rb'),
+    'zstd': ZstdReader,
+}
+
+DECOMPRESSION_ERRORS = (OSError, EOFError, zlib.error, zstandard.ZstdError)
+
+# The size of the pieces in which a body that is read at once is decompressed
+READ_ALL_SIZE = 64 * 1024
+
+
+class DecompressedStream(io.RawIOBase):
+    """
+    A readable file object over a decompressing stream, which refuses to
+    produce more than `max_size` bytes to guard against decompression bombs.
+    """
+
+    def __init__(self, stream, max_size: int):
+        super().__init__()
+        self.stream = stream
+        self.max_size = max_size
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        try:
+            data = self.stream.read(len(buffer))
+        except DECOMPRESSION_ERRORS as e:
+            raise BadRequest(f'Could not decompress the request body: {e}')
+
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise RequestDataTooBig(
+                'Decompressed request body exceeded '
+                'settings.MAX_DECOMPRESSED_BODY_SIZE.'
+            )
+        buffer[: len(data)] = data
+        return len(data)
+
+    def readall(self):
+        """
+        Read the rest of the body at once, e.g. for request.body. Django limits
+        bodies that are read into memory to DATA_UPLOAD_MAX_MEMORY_SIZE, but
+        only checks the compressed Content-Length, so the decompressed body
+        is checked here.
+        """
+        max_size = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        chunks = []
+        while data := self.read(READ_ALL_SIZE):
+            if max_size is not None and self.size > max_size:
+                raise RequestDataTooBig(
+                    'Request body exceeded settings.DATA_UPLOAD_MAX_MEMORY_SIZE.'
+                )
+            chunks.append(data)
+        return b''.join(chunks)
+
+
+class DecompressMiddleware:
+    """
+    Decompresses request bodies sent with `Content-Encoding: gzip` or `zstd`.
+
+    The body is decompressed while it is read, so views and parsers that
+    stream the body never hold it in memory as a whole. The decompressed
+    body is limited to settings.MAX_DECOMPRESSED_BODY_SIZE bytes, or to
+    settings.DATA_UPLOAD_MAX_MEMORY_SIZE bytes when it is read at once.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        encoding = request.META.get('HTTP_CONTENT_ENCODING', '').strip().lower()
+        if encoding and encoding != 'identity':
+            if encoding not in DECOMPRESSORS:
+                return HttpResponse(
+                    f'Unsupported Content-Encoding: {encoding}',
+                    status=415,
+                    content_type='text/plain',
+                )
+
+            stream = DECOMPRESSORS[encoding](request._stream)
+            request._stream = io.BufferedReader(
+                DecompressedStream(stream, settings.MAX_DECOMPRESSED_BODY_SIZE)
+            )
+            # The body is no longer encoded for the rest of the stack
+            del request.META['HTTP_CONTENT_ENCODING']
+
+        return self.get_response(request)
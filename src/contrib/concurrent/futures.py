@@ -0,0 +1,91 @@
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, Iterator
+
+import django
+
+# Starting the processes costs more than parsing a typical request, so the
+# pools are created once per number of workers and shared by all calls in
+# this process. A pool is replaced when one of its processes died.
+_executors: Dict[int, ProcessPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(workers: int) -> ProcessPoolExecutor:
+    """
+    The shared pool of `workers` processes, created on first use.
+
+    The processes are started by a forkserver instead of being forked from
+    this process, which may run other threads (e.g. in uwsgi) and hold open
+    database connections and locks (e.g. in the consumer's transaction).
+    They set up Django before they are called.
+    """
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            executor = _executors[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('forkserver'),
+                initializer=django.setup,
+            )
+        return executor
+
+
+def discard_executor(workers: int, executor: ProcessPoolExecutor):
+    """
+    Stop sharing a broken pool, so the next call creates a new one.
+    """
+    with _executors_lock:
+        if _executors.get(workers) is executor:
+            del _executors[workers]
+
+
+def submit_in_processes(
+    function: Callable, *iterables: Iterable, workers: int
+) -> Iterator[Future]:
+    """
+    Submit calls of `function` to the shared pool of `workers` processes and
+    yield their futures in order. At most two calls per worker are pending,
+    so the iterables are consumed lazily and the next items are processed
+    while the caller handles the results. The pending calls are cancelled
+    when the generator is closed.
+    """
+    executor = get_executor(workers)
+
+    def discard_if_broken(future: Future):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            discard_executor(workers, executor)
+
+    pending = deque()
+    try:
+        for args in zip(*iterables):
+            try:
+                future = executor.submit(function, *args)
+            except BrokenProcessPool:
+                discard_executor(workers, executor)
+                raise
+            future.add_done_callback(discard_if_broken)
+            pending.append(future)
+            if len(pending) >= 2 * workers:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def map_in_processes(function: Callable, *iterables: Iterable, workers: int):
+    """
+    Like `map`, but calls `function` in a pool of `workers` processes and
+    yields the results in order, see submit_in_processes.
+    """
+    futures = submit_in_processes(function, *iterables, workers=workers)
+    try:
+        for future in futures:
+            yield future.result()
+    finally:
+        futures.close()
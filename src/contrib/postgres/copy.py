@@ -0,0 +1,62 @@
+import io
+from datetime import date, datetime
+from typing import Any, Iterable, List
+
+# Characters that must be escaped in the COPY text format
+COPY_ESCAPES = [('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r')]
+
+
+class CopyStream(io.RawIOBase):
+    """
+    A readable file object over an iterable of lines, which allows
+    psycopg2's `copy_expert` to consume rows while they are produced.
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        super().__init__()
+        self.lines = iter(lines)
+        self.buffer = b''
+        self.line_count = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            line = next(self.lines, None)
+            if line is None:
+                break
+            self.buffer += line.encode()
+            self.line_count += 1
+
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def format_copy_value(value: Any) -> str:
+    """
+    Format a Python value for the PostgreSQL COPY text format.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+
+    value = str(value)
+    for char, escaped in COPY_ESCAPES:
+        value = value.replace(char, escaped)
+    return value
+
+
+def copy_rows(cursor, table: str, columns: List[str], rows: Iterable[tuple]) -> int:
+    """
+    Stream rows of Python values into the (quoted) table using
+    `COPY ... FROM STDIN`. Returns the number of rows written.
+    """
+    stream = CopyStream('\t'.join(map(format_copy_value, row)) + '\n' for row in rows)
+    cursor.copy_expert(f'COPY {table} ({", ".join(columns)}) FROM STDIN', stream)
+    return stream.line_count
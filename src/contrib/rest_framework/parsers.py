@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework.parsers import BaseParser
 
 
@@ -14,3 +15,21 @@ class PlainTextParser(BaseParser):
         and returns the resulting QueryDict.
         """
         return stream.read()
+
+
+class PlainTextLineParser(PlainTextParser):
+    """
+    Parser for plain text that is processed line by line.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Lazily parses the incoming bytestream into decoded lines (without
+        line endings). The stream is only read while the result is iterated,
+        so the body is never held in memory as a whole.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        return (
+            line for chunk in stream for line in chunk.decode(encoding).splitlines()
+        )
@@ -45,6 +45,7 @@ NOTEBOOK_ARGUMENTS = [
 
 MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusBeforeMiddleware",
+    "contrib.compression.middleware.DecompressMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -134,6 +135,70 @@ INGRESS_PERMISSION_CLASSES = [
 ]
 
 
+# V-Log ingestion
+# When enabled, plain text V-Log bodies are parsed from the request stream and
+# stored in chunks of VLOG_CHUNK_SIZE lines, instead of reading the whole body
+# into memory first.
+VLOG_STREAMING = strtobool(os.getenv("VLOG_STREAMING", "false"))
+VLOG_CHUNK_SIZE = int(os.getenv("VLOG_CHUNK_SIZE", 10000))
+
+# The engine used to store V-Log lines: "orm" (bulk_create), "copy" (COPY ...
+# FROM STDIN) or "columnar" (parse into arrays and COPY those, see
+# vlog.columnar). Can be overridden per request with the `engine` query parameter.
+VLOG_WRITE_ENGINE = os.getenv("VLOG_WRITE_ENGINE", "orm")
+
+# When enabled, bulks of V-Log lines stored with the "orm" or "copy" engine are
+# validated column by column (see api.vlog.serializers.FastVlogListSerializer)
+# instead of line by line.
+VLOG_FAST_VALIDATION = strtobool(os.getenv("VLOG_FAST_VALIDATION", "false"))
+
+# When enabled, the messages of stored V-Log lines are decoded into the tables
+# of the decoders in vlog.decoders, e.g. detector and signal group states.
+VLOG_DECODE_MESSAGES = strtobool(os.getenv("VLOG_DECODE_MESSAGES", "false"))
+
+# The number of processes used to parse bulks of V-Log lines. With more than
+# one worker, bulks are split into chunks of VLOG_CHUNK_SIZE lines which are
+# parsed in a process pool while the parsed chunks are stored.
+VLOG_PARSE_WORKERS = int(os.getenv("VLOG_PARSE_WORKERS", 1))
+
+# When set, plain text V-Log bodies are written to this directory and accepted
+# with a 202 instead of being stored while the request waits. The spooled
+# bodies are stored by the `drain_vlog_spool` management command.
+VLOG_SPOOL_DIR = os.getenv("VLOG_SPOOL_DIR")
+
+# Request bodies sent with `Content-Encoding: gzip` or `zstd` are decompressed
+# while they are read (see contrib.compression.middleware). Bodies larger than
+# this number of bytes after decompression are rejected. Bodies that are read
+# into memory at once are limited to DATA_UPLOAD_MAX_MEMORY_SIZE instead.
+MAX_DECOMPRESSED_BODY_SIZE = int(
+    os.getenv("MAX_DECOMPRESSED_BODY_SIZE", 512 * 1024 * 1024)
+)
+
+
+# Reistijden ingestion
+# The engine used to parse reistijden publications: "xmltodict" (parse the
+# whole document into a dict) or "iterparse" (convert one siteMeasurements
+# element at a time, see reistijden_v1.parser.ReistijdenParser).
+REISTIJDEN_PARSER_ENGINE = os.getenv("REISTIJDEN_PARSER_ENGINE", "xmltodict")
+# The engine used to store reistijden publications: "orm" (bulk_create per
+# model) or "copy" (COPY the rows into temporary staging tables and insert
+# them from there, see reistijden_v1.writers.copy_publication).
+REISTIJDEN_WRITE_ENGINE = os.getenv("REISTIJDEN_WRITE_ENGINE", "orm")
+# The maximum number of measurement sites cached per process, see
+# reistijden_v1.cache.MeasurementSiteCache. 0 disables the cache.
+REISTIJDEN_SITE_CACHE_SIZE = int(os.getenv("REISTIJDEN_SITE_CACHE_SIZE", 10000))
+# The number of ingress messages the reistijden consumer stores in one
+# transaction, see reistijden_v1.consumer.ReistijdenConsumer.consume_iterator,
+# also when REISTIJDEN_PARSE_WORKERS > 1. 1 stores every message in its own
+# transaction.
+REISTIJDEN_CONSUME_BATCH_SIZE = int(os.getenv("REISTIJDEN_CONSUME_BATCH_SIZE", 1))
+# The number of processes the reistijden consumer parses messages in, while
+# the messages parsed before are stored, see
+# reistijden_v1.consumer.ReistijdenConsumer.consume_pipelined.
+# 1 parses and stores every message in turn.
+REISTIJDEN_PARSE_WORKERS = int(os.getenv("REISTIJDEN_PARSE_WORKERS", 1))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/
 TIME_ZONE = "UTC"
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ReistijdenConfig(AppConfig):
     name = 'reistijden_v1'
+
+    def ready(self):
+        # Connect the signal receivers and register the system checks
+        from reistijden_v1 import cache, checks  # noqa: F401
@@ -0,0 +1,233 @@
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# The publication types of the XSD (see reistijden_v1/amsterdamtraveltimes.xsd),
+# and the measurement site type that goes with them
+PUBLICATION_SITE_TYPES = {
+    'travelTime': 'trajectory',
+    'individualTravelTime': 'section',
+    'trafficFlow': 'location',
+}
+
+TRAVEL_TIME_TYPES = ['raw', 'representative', 'processed', 'predicted', 'actual']
+
+
+class PhaseResult(NamedTuple):
+    phase: str
+    messages: int
+    seconds: float
+    queries: int
+    # The peak of the memory allocated while running the phase, in bytes,
+    # on top of the memory allocated before it
+    peak_memory: int
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.seconds if self.seconds else float('inf')
+
+    @property
+    def queries_per_message(self) -> float:
+        return self.queries / self.messages if self.messages else 0.0
+
+
+def xml_time(value: datetime) -> str:
+    return f'{value:%Y-%m-%dT%H:%M:%SZ}'
+
+
+def generate_camera(rng: random.Random, lane_number: int) -> str:
+    # The XSD allows every 22.5 degrees, but the element is an integer, so
+    # the directions are rounded down to whole degrees
+    view_direction = rng.randrange(16) * 45 // 2
+    return (
+        f'<camera id="{rng.getrandbits(128):032x}">'
+        f'<coordinates latitude="52.{rng.randrange(10**6):06d}" '
+        f'longitude="4.{rng.randrange(10**6):06d}" />'
+        f'<laneNumber>{lane_number}</laneNumber>'
+        f'<status>on</status>'
+        f'<viewDirection>{view_direction}</viewDirection>'
+        f'</camera>'
+    )
+
+
+def generate_lanes(rng: random.Random, lane_count: int) -> str:
+    return ''.join(
+        f'<lane specificLane="lane{lane}">{generate_camera(rng, lane)}</lane>'
+        for lane in range(1, lane_count + 1)
+    )
+
+
+def generate_site(site_type: str, index: int, locations: int, lanes: int) -> str:
+    """
+    A measurement site, which is the same for every publication it is
+    generated for.
+    """
+    rng = random.Random(f'{site_type}-{index}')
+    if site_type == 'location':
+        itinerary = f'<location>{generate_lanes(rng, lanes)}</location>'
+    else:
+        itinerary = (
+            '<locationContainedInItinerary>'
+            + ''.join(
+                f'<location index="{location}">{generate_lanes(rng, lanes)}</location>'
+                for location in range(1, locations + 1)
+            )
+            + '</locationContainedInItinerary>'
+        )
+    length = (
+        '' if site_type == 'location' else f'<length>{rng.randrange(10**4)}</length>'
+    )
+    return (
+        f'<measurementSiteReference id="{site_type.upper()}_{index}" version="1.0">'
+        f'<measurementSiteName>{site_type}_{index}</measurementSiteName>'
+        f'<measurementSiteType>{site_type}</measurementSiteType>'
+        f'{length}{itinerary}'
+        f'</measurementSiteReference>'
+    )
+
+
+def generate_values(
+    rng: random.Random, publication_type: str, count: int, start: datetime
+) -> str:
+    """
+    The measured values of a site in a publication of the type.
+    """
+    if publication_type == 'travelTime':
+        return ''.join(
+            f'<travelTimeData travelTimeType="{TRAVEL_TIME_TYPES[i % 5]}" '
+            f'dataQuality="{rng.uniform(0, 100):.6f}" estimationType="estimated">'
+            f'<travelTime>{rng.randrange(1, 1000)}</travelTime>'
+            f'<trafficSpeed>{rng.randrange(1, 130)}</trafficSpeed>'
+            f'</travelTimeData>'
+            for i in range(count)
+        )
+    if publication_type == 'individualTravelTime':
+        values = []
+        for _ in range(count):
+            detection_start = start + timedelta(seconds=rng.randrange(60))
+            travel_time = rng.randrange(1, 600)
+            values.append(
+                f'<individualTravelTimeData>'
+                f'<licensePlate>{rng.getrandbits(160):040X}</licensePlate>'
+                f'<vehicleCategory>M1</vehicleCategory>'
+                f'<startDetectionTime>{xml_time(detection_start)}</startDetectionTime>'
+                f'<endDetectionTime>'
+                f'{xml_time(detection_start + timedelta(seconds=travel_time))}'
+                f'</endDetectionTime>'
+                f'<travelTime>{travel_time}</travelTime>'
+                f'<trafficSpeed>{rng.randrange(1, 130)}</trafficSpeed>'
+                f'</individualTravelTimeData>'
+            )
+        return ''.join(values)
+    return (
+        '<trafficFlowData>'
+        + ''.join(
+            f'<measuredFlow specificLane="lane{lane}">'
+            f'<vehicleFlow>{rng.randrange(100)}</vehicleFlow>'
+            f'<numberOfInputValuesUsed>'
+            f'<category count="{rng.randrange(100)}" type="Auto" />'
+            f'<category count="{rng.randrange(10)}" type="Bedrijfsauto Licht" />'
+            f'</numberOfInputValuesUsed>'
+            f'</measuredFlow>'
+            for lane in range(1, count + 1)
+        )
+        + '</trafficFlowData>'
+    )
+
+
+def generate_publication(
+    publication_type: str,
+    site_count: int,
+    values_per_site: int = 3,
+    locations_per_site: int = 2,
+    lanes_per_location: int = 2,
+    start: datetime = datetime(2022, 1, 1),
+    seed: int = 0,
+) -> str:
+    """
+    Generate a synthetic publication of the type (see PUBLICATION_SITE_TYPES)
+    with `site_count` measurements. The sites are the same for every
+    publication, the measured values depend on the seed.
+    """
+    rng = random.Random(seed)
+    site_type = PUBLICATION_SITE_TYPES[publication_type]
+    measurements = ''.join(
+        f'<siteMeasurements>'
+        f'{generate_site(site_type, index, locations_per_site, lanes_per_location)}'
+        f'{generate_values(rng, publication_type, values_per_site, start)}'
+        f'</siteMeasurements>'
+        for index in range(site_count)
+    )
+    return (
+        f'<?xml version="1.0" encoding="UTF-8" ?>\n'
+        f'<amsterdamTravelTimes>'
+        f'<payloadPublication type="{publication_type}">'
+        f'<publicationReference id="BENCHMARK_{publication_type}" version="1.0" />'
+        f'<publicationTime>{xml_time(start + timedelta(minutes=1))}</publicationTime>'
+        f'<measurementPeriod>'
+        f'<measurementStartTime>{xml_time(start)}</measurementStartTime>'
+        f'<measurementEndTime>{xml_time(start + timedelta(minutes=1))}'
+        f'</measurementEndTime>'
+        f'</measurementPeriod>'
+        f'{measurements}'
+        f'</payloadPublication>'
+        f'</amsterdamTravelTimes>'
+    )
+
+
+def run_phases(
+    phases: List[tuple], items: List, trace_memory: bool
+) -> Dict[str, PhaseResult]:
+    """
+    Run the phases one after the other, each phase calling its function
+    for the results of the previous phase, and measure the time, the
+    number of queries and (when tracing memory) the peak of the memory
+    allocated per phase, not counting the results of the previous phases.
+
+    :param phases: (name, function) pairs.
+    """
+    results = {}
+    for phase, function in phases:
+        if trace_memory:
+            # The results of the previous phases are still allocated
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            items = [function(item) for item in items]
+            seconds = time.perf_counter() - start
+        peak_memory = (
+            tracemalloc.get_traced_memory()[1] - start_memory if trace_memory else 0
+        )
+        results[phase] = PhaseResult(
+            phase, len(items), seconds, len(queries.captured_queries), peak_memory
+        )
+    return results
+
+
+def measure_phases(
+    phases: List[tuple], items: List, run: Callable = None
+) -> List[PhaseResult]:
+    """
+    Measure the phases (see run_phases) in two runs. The time and queries
+    are measured in the first, the memory in the second, since tracing
+    memory allocations slows the code down.
+
+    :param run: Wraps each run, e.g. in a transaction that is rolled back.
+    """
+    run = run or (lambda function: function())
+    timed = run(lambda: run_phases(phases, items, trace_memory=False))
+    tracemalloc.start()
+    try:
+        traced = run(lambda: run_phases(phases, items, trace_memory=True))
+    finally:
+        tracemalloc.stop()
+    return [
+        result._replace(peak_memory=traced[phase].peak_memory)
+        for phase, result in timed.items()
+    ]
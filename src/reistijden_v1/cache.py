@@ -0,0 +1,88 @@
+from collections import OrderedDict
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from prometheus_client import Counter
+
+measurement_site_cache_hits = Counter(
+    'reistijden_measurement_site_cache_hits',
+    'The number of measurement sites found in the measurement site cache',
+)
+measurement_site_cache_misses = Counter(
+    'reistijden_measurement_site_cache_misses',
+    'The number of measurement sites not found in the measurement site cache',
+)
+
+
+class MeasurementSiteCache:
+    """
+    A per process, least recently used cache of measurement sites by the
+    hash of their json (see MeasurementSite.hash_json), which is bounded by
+    REISTIJDEN_SITE_CACHE_SIZE.
+
+    Sites are only added when the transaction they were read or created in
+    is committed, so sites that are rolled back are never cached. Deleted
+    sites are evicted, see evict_deleted_measurement_site and evict_deleted.
+    """
+
+    def __init__(self):
+        self.sites = OrderedDict()
+
+    def get(self, key: str):
+        site = self.sites.get(key)
+        if site is None:
+            measurement_site_cache_misses.inc()
+            return None
+
+        measurement_site_cache_hits.inc()
+        self.sites.move_to_end(key)
+        return site
+
+    def add(self, key: str, site):
+        """
+        Add the site when the current transaction is committed.
+        """
+        if settings.REISTIJDEN_SITE_CACHE_SIZE > 0:
+            transaction.on_commit(lambda: self.put(key, site))
+
+    def put(self, key: str, site):
+        self.sites[key] = site
+        self.sites.move_to_end(key)
+        while len(self.sites) > settings.REISTIJDEN_SITE_CACHE_SIZE:
+            self.sites.popitem(last=False)
+
+    def evict(self, site_id: Optional[int]):
+        for key in [key for key, site in self.sites.items() if site.id == site_id]:
+            del self.sites[key]
+
+    def evict_deleted(self) -> bool:
+        """
+        Evict the sites that no longer exist. Sites deleted by another
+        process are not evicted by evict_deleted_measurement_site, storing a
+        measurement for them fails instead, see ReistijdenConsumer.consume_batch.
+
+        :return: Whether any sites were evicted.
+        """
+        MeasurementSite = apps.get_model('reistijden_v1', 'MeasurementSite')
+        site_ids = {site.id for site in self.sites.values()}
+        deleted = site_ids - set(
+            MeasurementSite.objects.filter(id__in=site_ids).values_list('id', flat=True)
+        )
+        for key in [key for key, site in self.sites.items() if site.id in deleted]:
+            del self.sites[key]
+        return bool(deleted)
+
+    def clear(self):
+        self.sites.clear()
+
+
+measurement_site_cache = MeasurementSiteCache()
+
+
+@receiver(post_delete, sender='reistijden_v1.MeasurementSite')
+def evict_deleted_measurement_site(sender, instance, **kwargs):
+    measurement_site_cache.evict(instance.id)
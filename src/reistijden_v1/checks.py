@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+from reistijden_v1.parser import PARSER_ENGINES
+from reistijden_v1.writers import WRITE_ENGINES
+
+
+@register()
+def check_write_engine(app_configs, **kwargs):
+    """
+    REISTIJDEN_WRITE_ENGINE must be one of the engines in WRITE_ENGINES, so
+    an unknown engine fails at startup instead of on every message.
+    """
+    if settings.REISTIJDEN_WRITE_ENGINE in WRITE_ENGINES:
+        return []
+    return [
+        Error(
+            f'Unknown REISTIJDEN_WRITE_ENGINE '
+            f'{settings.REISTIJDEN_WRITE_ENGINE!r}.',
+            hint=f'Use one of {", ".join(WRITE_ENGINES)}.',
+            id='reistijden_v1.E001',
+        )
+    ]
+
+
+@register()
+def check_parser_engine(app_configs, **kwargs):
+    """
+    REISTIJDEN_PARSER_ENGINE must be one of the engines in PARSER_ENGINES.
+    """
+    if settings.REISTIJDEN_PARSER_ENGINE in PARSER_ENGINES:
+        return []
+    return [
+        Error(
+            f'Unknown REISTIJDEN_PARSER_ENGINE '
+            f'{settings.REISTIJDEN_PARSER_ENGINE!r}.',
+            hint=f'Use one of {", ".join(PARSER_ENGINES)}.',
+            id='reistijden_v1.E002',
+        )
+    ]
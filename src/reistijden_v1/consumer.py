@@ -1,26 +1,65 @@
 import logging
+from itertools import islice
+from typing import Dict, List, Optional
 
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from ingress.consumer.base import BaseConsumer
+from ingress.models import Message
 from rest_framework.exceptions import ValidationError
 
+from contrib.concurrent.futures import submit_in_processes
+from reistijden_v1.cache import measurement_site_cache
+from reistijden_v1.models import MeasurementSite
 from reistijden_v1.parser import ReistijdenParser
 from reistijden_v1.serializers import PublicationSerializer
+from reistijden_v1.writers import WRITE_ENGINES
 
 logger = logging.getLogger(__name__)
 
 
+def parse_publication(raw_data) -> dict:
+    """
+    Parse and validate a publication, without touching the database.
+
+    :return: The validated data of the publication.
+    """
+    restructured_data = ReistijdenParser(raw_data).restructure_data()
+
+    publication_serializer = PublicationSerializer(data=restructured_data)
+    publication_serializer.is_valid(raise_exception=True)
+    return publication_serializer.validated_data
+
+
 class ReistijdenConsumer(BaseConsumer):
     collection_name = 'reistijden_v1'
 
+    def get_default_batch_size(self):
+        return max(
+            settings.REISTIJDEN_CONSUME_BATCH_SIZE, super().get_default_batch_size()
+        )
+
+    def store_publication(
+        self,
+        validated_data: dict,
+        measurement_sites: Optional[Dict[str, MeasurementSite]] = None,
+    ):
+        """
+        Store a validated publication with the configured engine.
+
+        :param measurement_sites: The measurement sites resolved before in the
+                                  same transaction, see
+                                  MeasurementSite.get_or_create_many.
+        """
+        WRITE_ENGINES[settings.REISTIJDEN_WRITE_ENGINE](
+            validated_data, measurement_sites
+        )
+
     def consume_raw_data(self, raw_data):
         # note that exceptions are not handled here, but must be raised
         # so that the message will be moved to the failed queue.
         try:
-            restructured_data = ReistijdenParser(raw_data).restructure_data()
-
-            publication_serializer = PublicationSerializer(data=restructured_data)
-            publication_serializer.is_valid(raise_exception=True)
-            publication_serializer.save()
+            self.store_publication(parse_publication(raw_data))
         except ValidationError as e:
             logger.error('Validation Error on consume_raw_data')
             logger.exception(e)
@@ -29,3 +68,122 @@ class ReistijdenConsumer(BaseConsumer):
             logger.error("Exception called on consume_raw_data")
             logger.exception(e)
             self.on_consume_error(raw_data)
+
+    def consume_message(self, message: Message):
+        """
+        Like BaseConsumer.consume_message, but stores the message with
+        consume_batch.
+        """
+        if message.consume_started:
+            return
+
+        self.on_consume_start(message)
+        try:
+            self.consume_batch([message])
+        except Exception as e:
+            logger.error('Exception in consume_message')
+            logger.exception(e)
+            self.on_consume_error(message)
+
+    def store_batch(
+        self, messages: List[Message], validated_data: Optional[List[dict]] = None
+    ):
+        """
+        Store the publications of the messages in one transaction, resolving
+        their measurement sites together.
+
+        :param validated_data: The publications of the messages, if they were
+                               parsed before. They are consumed by storing them.
+        """
+        if validated_data is None:
+            validated_data = (parse_publication(m.raw_data) for m in messages)
+
+        measurement_sites = {}
+        with transaction.atomic():
+            for data in validated_data:
+                self.store_publication(data, measurement_sites)
+            # Only when all messages are stored, since removing a message
+            # also resets its primary key
+            for message in messages:
+                self.on_consume_success(message)
+
+    def consume_batch(
+        self, messages: List[Message], validated_data: Optional[List[dict]] = None
+    ):
+        """
+        Store the messages with store_batch. Raises when any of them fails.
+
+        The measurement sites are cached per process, so the sites deleted by
+        another process are still used until storing a measurement for them
+        fails. Those sites are then evicted and the messages stored again.
+        """
+        try:
+            self.store_batch(messages, validated_data)
+        except IntegrityError:
+            if not measurement_site_cache.evict_deleted():
+                raise
+            logger.warning('Evicted deleted measurement sites, storing again')
+            self.store_batch(messages)
+
+    def consume_pipelined(
+        self, messages: List[Message], workers: int, batch_size: int = 1
+    ):
+        """
+        Parse the messages in a pool of `workers` processes, while the
+        messages parsed before are stored in this process. The messages are
+        stored in order, in transactions of `batch_size` messages like
+        consume_batch. When a batch fails, its messages are consumed one by
+        one.
+        """
+        futures = submit_in_processes(
+            parse_publication,
+            [message.raw_data for message in messages],
+            workers=workers,
+        )
+        pending = zip(messages, futures)
+        while batch := list(islice(pending, batch_size)):
+            batch_messages = [message for message, _ in batch]
+            try:
+                # Raises the exception of the parser processes, if any
+                self.consume_batch(
+                    batch_messages, [future.result() for _, future in batch]
+                )
+            except Exception as e:
+                logger.error('Exception in consume_pipelined')
+                logger.exception(e)
+                if len(batch) == 1:
+                    self.on_consume_error(batch_messages[0])
+                else:
+                    # Storing consumes the parsed publications, so the
+                    # messages are parsed again
+                    super().consume_iterator(batch_messages)
+
+    def consume_iterator(self, message_iterator):
+        """
+        With REISTIJDEN_PARSE_WORKERS > 1 the locked messages are parsed in
+        a pool of processes, see consume_pipelined.
+
+        With REISTIJDEN_CONSUME_BATCH_SIZE > 1 the locked messages are
+        consumed in batches of that size, also when they are parsed in a
+        pool of processes. When a batch fails, its messages are consumed one
+        by one, so only the failing messages are moved to the failed queue.
+        """
+        workers = settings.REISTIJDEN_PARSE_WORKERS
+        batch_size = settings.REISTIJDEN_CONSUME_BATCH_SIZE
+        if workers <= 1 and batch_size <= 1:
+            return super().consume_iterator(message_iterator)
+
+        messages = [
+            message for message in message_iterator if not message.consume_started
+        ]
+        if workers > 1:
+            return self.consume_pipelined(messages, workers, batch_size)
+
+        for start in range(0, len(messages), batch_size):
+            batch = messages[start : start + batch_size]
+            try:
+                self.consume_batch(batch)
+            except Exception as e:
+                logger.error('Exception in consume_batch, consuming one by one')
+                logger.exception(e)
+                super().consume_iterator(batch)
@@ -0,0 +1,137 @@
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from reistijden_v1.benchmark import (
+    PUBLICATION_SITE_TYPES,
+    generate_publication,
+    measure_phases,
+)
+from reistijden_v1.models import MeasurementSite
+from reistijden_v1.parser import PARSER_ENGINES, ReistijdenParser
+from reistijden_v1.serializers import PublicationSerializer
+from reistijden_v1.writers import WRITE_ENGINES
+
+from .util import profile_it, time_it
+
+
+def validate(restructured_data):
+    serializer = PublicationSerializer(data=restructured_data)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+def resolve_sites(validated_data):
+    measurement_sites = {}
+    MeasurementSite.get_or_create_many(
+        [
+            measurement['measurement_site']
+            for measurement in validated_data['measurements']
+        ],
+        validated_data['measurement_start_time'],
+        measurement_sites,
+    )
+    return validated_data, measurement_sites
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the messages per second, queries per message and peak memory '
+        'of the parse, validate, site resolution and write phases of the '
+        'reistijden ingestion with synthetic publications. The publications '
+        'are written in transactions that are rolled back, but run it against '
+        'a throwaway database nonetheless.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--publication-type',
+            choices=list(PUBLICATION_SITE_TYPES),
+            default='travelTime',
+        )
+        parser.add_argument('--messages', type=int, default=10)
+        parser.add_argument(
+            '--sites', type=int, default=100, help='Measurements per publication'
+        )
+        parser.add_argument(
+            '--values',
+            type=int,
+            default=3,
+            help='Travel times, individual travel times or lanes per measurement',
+        )
+        parser.add_argument('--locations', type=int, default=2)
+        parser.add_argument('--lanes', type=int, default=2)
+        parser.add_argument(
+            '--engine',
+            choices=list(WRITE_ENGINES),
+            default=settings.REISTIJDEN_WRITE_ENGINE,
+        )
+        parser.add_argument(
+            '--parser-engine',
+            choices=PARSER_ENGINES,
+            default=settings.REISTIJDEN_PARSER_ENGINE,
+        )
+        parser.add_argument(
+            '--new-sites',
+            action='store_true',
+            help='Do not create the measurement sites before measuring, so '
+            'the first message creates them',
+        )
+        parser.add_argument(
+            '--profile',
+            action='store_true',
+            help='Profile the phases with pyinstrument, when it is installed',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        messages = [
+            generate_publication(
+                options['publication_type'],
+                options['sites'],
+                values_per_site=options['values'],
+                locations_per_site=options['locations'],
+                lanes_per_location=options['lanes'],
+                seed=options['seed'] + i,
+            )
+            for i in range(options['messages'])
+        ]
+        write = WRITE_ENGINES[options['engine']]
+
+        def parse(xml):
+            return ReistijdenParser(
+                xml, engine=options['parser_engine']
+            ).restructure_data()
+
+        phases = [
+            ('parse', parse),
+            ('validate', validate),
+            ('resolve sites', resolve_sites),
+            ('write', lambda item: write(*item)),
+        ]
+
+        def rolled_back(function):
+            with transaction.atomic():
+                if not options['new_sites'] and messages:
+                    # The sites of all messages are the same
+                    resolve_sites(validate(parse(messages[0])))
+                result = function()
+                transaction.set_rollback(True)
+            return result
+
+        profile = profile_it() if options['profile'] else nullcontext()
+        with profile, time_it('benchmark_reistijden'):
+            results = measure_phases(phases, messages, run=rolled_back)
+
+        self.stdout.write(
+            f'{"phase":<16} | {"messages/second":>15} | {"queries/message":>15} | '
+            f'{"peak memory (MiB)":>17}'
+        )
+        for result in results:
+            self.stdout.write(
+                f'{result.phase:<16} | {result.messages_per_second:>15.1f} | '
+                f'{result.queries_per_message:>15.1f} | '
+                f'{result.peak_memory / 2**20:>17.1f}'
+            )
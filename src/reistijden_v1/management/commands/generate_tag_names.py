@@ -0,0 +1,52 @@
+import os
+from xml.etree import ElementTree
+
+import humps
+from django.core.management import BaseCommand
+
+import reistijden_v1.tag_names
+
+XSD_NAMESPACE = '{http://www.w3.org/2001/XMLSchema}'
+
+# Next to the app, so it is available wherever the source is deployed
+DEFAULT_XSD_PATH = os.path.join(
+    os.path.dirname(reistijden_v1.tag_names.__file__), 'amsterdamtraveltimes.xsd'
+)
+
+MODULE_TEMPLATE = '''"""
+The snake_case keys of the element and attribute names of the reistijden
+publications, generated from reistijden_v1/amsterdamtraveltimes.xsd by
+the `generate_tag_names` management command. Do not edit by hand.
+"""
+
+TAG_NAMES = {{
+{items}}}
+'''
+
+
+def read_tag_names(xsd_path: str) -> dict:
+    """
+    The element and attribute names defined in the XSD, mapped to the
+    keys xmltodict and humps.decamelize produce for them.
+    """
+    schema = ElementTree.parse(xsd_path).getroot()
+    elements = schema.iter(f'{XSD_NAMESPACE}element')
+    attributes = schema.iter(f'{XSD_NAMESPACE}attribute')
+    # Elements and attributes that refer to a definition have no name
+    names = {element.get('name') for element in elements} - {None}
+    names |= {f"@{name}" for name in {a.get('name') for a in attributes} - {None}}
+    return {name: humps.decamelize(name) for name in sorted(names)}
+
+
+class Command(BaseCommand):
+    help = 'Generate reistijden_v1/tag_names.py from the XSD of the publications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--xsd', default=DEFAULT_XSD_PATH)
+
+    def handle(self, *args, **options):
+        tag_names = read_tag_names(options['xsd'])
+        items = ''.join(f"    '{name}': '{key}',\n" for name, key in tag_names.items())
+        with open(reistijden_v1.tag_names.__file__, 'w') as file:
+            file.write(MODULE_TEMPLATE.format(items=items))
+        self.stdout.write(f'Wrote {len(tag_names)} tag names')
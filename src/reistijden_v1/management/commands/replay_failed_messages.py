@@ -0,0 +1,95 @@
+import os
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from ingress.models import FailedMessage
+
+from reistijden_v1.consumer import ReistijdenConsumer
+from reistijden_v1.replay import ReplayResult, replay_failed_messages
+
+
+def datetime_argument(value):
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f'Invalid date time: {value}')
+    return date
+
+
+class Command(BaseCommand):
+    help = 'Consume failed reistijden messages again, in parallel batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            type=datetime_argument,
+            help='Only messages received at or after this (ISO 8601) time',
+        )
+        parser.add_argument(
+            '--until',
+            type=datetime_argument,
+            help='Only messages received before this (ISO 8601) time',
+        )
+        parser.add_argument(
+            '--error',
+            help='Only messages that failed with an error containing this text, '
+            'e.g. "ValidationError"',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='The number of messages stored in one transaction',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='The number of processes messages are parsed in',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the messages that would be replayed',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size and --workers must be at least 1')
+
+        queryset = FailedMessage.objects.filter(
+            collection__name=ReistijdenConsumer.collection_name
+        )
+        if options['since']:
+            queryset = queryset.filter(created_at__gte=options['since'])
+        if options['until']:
+            queryset = queryset.filter(created_at__lt=options['until'])
+        if options['error']:
+            queryset = queryset.filter(consume_fail_info__contains=options['error'])
+
+        total = queryset.count()
+        self.stdout.write(f'{total} failed messages to replay')
+        if options['dry_run'] or not total:
+            return
+
+        start = time.perf_counter()
+
+        def progress(result: ReplayResult):
+            done = result.replayed + result.failed
+            rate = done / (time.perf_counter() - start)
+            self.stdout.write(
+                f'{done}/{total} messages | {result.replayed} replayed | '
+                f'{result.failed} failed | {rate:.1f} messages/s'
+            )
+
+        result = replay_failed_messages(
+            queryset,
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            progress=progress,
+        )
+        duration = time.perf_counter() - start
+        self.stdout.write(
+            f'Replayed {result.replayed} messages, {result.failed} failed again, '
+            f'in {duration:.1f} seconds'
+        )
@@ -0,0 +1,61 @@
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+
+
+def hash_json(measurement_site_json):
+    # A copy of MeasurementSite.hash_json at the time of this migration
+    data = json.dumps(measurement_site_json, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def backfill_measurement_site_hash(apps, schema_editor):
+    MeasurementSite = apps.get_model('reistijden_v1', 'MeasurementSite')
+    batch = []
+    for measurement_site in MeasurementSite.objects.only(
+        'id', 'measurement_site_json'
+    ).iterator(chunk_size=1000):
+        measurement_site.measurement_site_hash = hash_json(
+            measurement_site.measurement_site_json
+        )
+        batch.append(measurement_site)
+        if len(batch) == 1000:
+            MeasurementSite.objects.bulk_update(batch, ['measurement_site_hash'])
+            batch = []
+    MeasurementSite.objects.bulk_update(batch, ['measurement_site_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reistijden_v1', '0021_measurements_in_range'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='measurementsite',
+            name='measurement_site_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.RunPython(
+            backfill_measurement_site_hash, reverse_code=migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='measurementsite',
+            name='measurement_site_hash',
+            field=models.CharField(
+                help_text='The SHA-256 hash (hexadecimal) of the canonical representation of measurement_site_json, which identifies the measurement site.',
+                max_length=64,
+                unique=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name='measurementsite',
+            name='measurement_site_json',
+            field=models.JSONField(
+                help_text='This field is made to include a nested json object containing the measurement site meta data and locations, its lanes and its respective cameras. If something changes in the measurement site or any of the locations, lanes or cameras, new records need to be created for all of them. To be able to test this somewhat easily, we create a json object in this field to be able to test for changes in any of those objects by doing a select on all fields of the measurement site, including this locations_json. Note that the order of keys in the json objects does not matter when using a native jsonb field.'
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Django creates foreign keys as DEFERRABLE INITIALLY DEFERRED, so they are
+# only checked when the transaction is committed. The measurement sites are
+# cached per process (see reistijden_v1.cache), and a measurement referring
+# to a site deleted by another process must fail when it is inserted, so the
+# consumer can evict the site and store the publication again.
+ALTER_CONSTRAINT = """
+DO $$
+DECLARE
+    constraint_name text;
+BEGIN
+    SELECT conname INTO STRICT constraint_name
+    FROM pg_constraint
+    WHERE conrelid = 'reistijden_v1_measurement'::regclass
+        AND confrelid = 'reistijden_v1_measurementsite'::regclass
+        AND contype = 'f';
+    EXECUTE format(
+        'ALTER TABLE reistijden_v1_measurement ALTER CONSTRAINT %%I %s',
+        constraint_name
+    );
+END
+$$
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reistijden_v1', '0022_measurementsite_measurement_site_hash'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=ALTER_CONSTRAINT % 'DEFERRABLE INITIALLY IMMEDIATE',
+            reverse_sql=ALTER_CONSTRAINT % 'DEFERRABLE INITIALLY DEFERRED',
+        ),
+    ]
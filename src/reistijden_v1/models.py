@@ -1,8 +1,13 @@
 import copy
+import hashlib
+import json
 from datetime import datetime
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
 
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models
+
+from reistijden_v1.cache import measurement_site_cache
 
 
 class Publication(models.Model):
@@ -134,13 +139,18 @@ class MeasurementSite(models.Model):
         ),
     )
 
-    # here we use the json representation as a unique key to identity measurement
-    # sites, it would be possible to use a hash of this json, however since the
-    # expectation is that this table will not be large, and storing the json is
-    # useful for debugging purposes.
+    # Measurement sites are identified by a hash of their json representation,
+    # see hash_json. The json itself is kept, since it is useful for debugging.
+    measurement_site_hash = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text=(
+            "The SHA-256 hash (hexadecimal) of the canonical representation of "
+            "measurement_site_json, which identifies the measurement site."
+        ),
+    )
     measurement_site_json = models.JSONField(
         null=False,
-        unique=True,
         help_text=(
             "This field is made to include a nested json object containing the measurement"
             " site meta data and locations, its lanes and its respective cameras. If"
@@ -154,19 +164,20 @@ class MeasurementSite(models.Model):
     )
     first_publication_timestamp = models.DateTimeField(null=True)
 
-    @classmethod
-    def get_or_create(
-        cls,
-        measurement_site_json: dict,
-        publication_timestamp: datetime,
-    ) -> Tuple[bool, 'MeasurementSite']:
+    @staticmethod
+    def hash_json(measurement_site_json: dict) -> str:
         """
-        Get an existing measurement, or create a new one if it does not exist
-        using the given json as an identifying key.
+        The SHA-256 hash of the json with sorted keys, with its lists already
+        sorted (see canonicalize_json).
+        """
+        data = json.dumps(measurement_site_json, sort_keys=True, cls=DjangoJSONEncoder)
+        return hashlib.sha256(data.encode()).hexdigest()
 
-        :return: Tuple where the first element denotes whether the measurement
-                 site was created or not (True == created, False == retrieved).
-                 The second element is the created or retrieved measurement site.
+    @staticmethod
+    def canonicalize_json(measurement_site_json: dict) -> dict:
+        """
+        A copy of the json with its lists sorted, so equal measurement sites
+        have equal json.
         """
         # we will modify measurement_site_json so best to perform a
         # deep copy first so that we don't mutate an object from the caller
@@ -188,43 +199,217 @@ class MeasurementSite(models.Model):
                 cameras = lane['cameras']
                 cameras.sort(key=lambda x: tuple(x.values()))
 
+        return measurement_site_json
+
+    @classmethod
+    def from_json(
+        cls, measurement_site_json: dict, publication_timestamp: datetime
+    ) -> 'MeasurementSite':
+        """
+        A new (unsaved) measurement site for a canonicalized json.
+        """
         # measurement_locations is not a field, so we need to remove it
-        # from the values past to defaults, but we want to keep it in
+        # from the values past to the model, but we want to keep it in
         # measurement_site_json
-        defaults = dict(measurement_site_json)
-        defaults.pop('measurement_locations')
+        fields = dict(measurement_site_json)
+        fields.pop('measurement_locations')
+        return cls(
+            **fields,
+            measurement_site_hash=cls.hash_json(measurement_site_json),
+            measurement_site_json=measurement_site_json,
+            first_publication_timestamp=publication_timestamp,
+        )
 
-        # if we will create the measurement site then the first_publication_timestamp
-        # will be set to this publication timestamp (otherwise we leave it intact)
-        # this assumes that the publications are received in the correct order.
-        defaults['first_publication_timestamp'] = publication_timestamp
+    @classmethod
+    def insert_many(
+        cls, measurement_sites: List['MeasurementSite']
+    ) -> List['MeasurementSite']:
+        """
+        Insert new measurement sites (see from_json) with a single
+        `INSERT ... ON CONFLICT DO NOTHING RETURNING`, which skips sites
+        that were inserted concurrently, e.g. by another consumer, instead of
+        failing. When that transaction has not been committed yet, the insert
+        waits for it.
 
-        measurement_site, created = MeasurementSite.objects.get_or_create(
-            measurement_site_json=measurement_site_json,
-            defaults=defaults,
+        :return: The sites that were inserted, with their primary keys set.
+        """
+        if not measurement_sites:
+            return []
+
+        fields = [field for field in cls._meta.concrete_fields if not field.primary_key]
+        quote_name = connection.ops.quote_name
+        columns = ', '.join(quote_name(field.column) for field in fields)
+        placeholders = ', '.join(
+            [f'({", ".join(["%s"] * len(fields))})'] * len(measurement_sites)
         )
+        params = [
+            field.get_db_prep_save(getattr(site, field.attname), connection)
+            for site in measurement_sites
+            for field in fields
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {quote_name(cls._meta.db_table)} ({columns}) '
+                f'VALUES {placeholders} ON CONFLICT (measurement_site_hash) '
+                f'DO NOTHING RETURNING id, measurement_site_hash',
+                params,
+            )
+            rows = cursor.fetchall()
+
+        ids = {measurement_site_hash: pk for pk, measurement_site_hash in rows}
+        inserted = []
+        for site in measurement_sites:
+            if site.measurement_site_hash in ids:
+                site.id = ids[site.measurement_site_hash]
+                site._state.adding = False
+                inserted.append(site)
+        return inserted
+
+    @staticmethod
+    def create_subtrees(measurement_sites: List['MeasurementSite']):
+        """
+        Create the locations, lanes and cameras of new measurement sites (see
+        from_json) with one bulk insert per model.
+        """
+        locations = []
+        lanes = []
+        cameras = []
+        for measurement_site in measurement_sites:
+            site_json = measurement_site.measurement_site_json
+            for location_json in site_json['measurement_locations']:
+                location = MeasurementLocation(
+                    measurement_site=measurement_site,
+                    **{k: v for k, v in location_json.items() if k != 'lanes'},
+                )
+                locations.append(location)
+                for lane_json in location_json['lanes']:
+                    lane = Lane(
+                        measurement_location=location,
+                        **{k: v for k, v in lane_json.items() if k != 'cameras'},
+                    )
+                    lanes.append(lane)
+                    cameras += [
+                        Camera(lane=lane, **camera_json)
+                        for camera_json in lane_json['cameras']
+                    ]
+
+        # On PostgreSQL bulk_create sets the primary keys, which the next
+        # level refers to
+        MeasurementLocation.objects.bulk_create(locations)
+        Lane.objects.bulk_create(lanes)
+        Camera.objects.bulk_create(cameras)
 
-        # If we created a new measurement site, then the underlying entities
-        # (locations, lanes and cameras) also need to be created.
-        for measurement_location_json in measurement_site_json['measurement_locations']:
-            lanes = measurement_location_json.pop('lanes')
-            measurement_location, _ = MeasurementLocation.objects.get_or_create(
-                measurement_site=measurement_site,
-                **measurement_location_json,
+    @classmethod
+    def get_or_create_many(
+        cls,
+        measurement_site_jsons: List[dict],
+        publication_timestamp: datetime,
+        resolved: Optional[Dict[str, 'MeasurementSite']] = None,
+    ) -> List['MeasurementSite']:
+        """
+        Get or create the measurement sites of a publication at once, see
+        get_or_create. Sites that are not cached are looked up with a single
+        query, the missing sites are created with bulk inserts.
+
+        :param resolved: The sites resolved before in the same transaction by
+                         their hash, e.g. for the other publications of a batch.
+                         The sites resolved now are added to it.
+        :return: The measurement site for each json, in the same order.
+        """
+        if resolved is None:
+            resolved = {}
+
+        jsons = {}
+        hashes = []
+        for measurement_site_json in measurement_site_jsons:
+            measurement_site_json = cls.canonicalize_json(measurement_site_json)
+            measurement_site_hash = cls.hash_json(measurement_site_json)
+            jsons[measurement_site_hash] = measurement_site_json
+            hashes.append(measurement_site_hash)
+
+        sites = {}
+        for measurement_site_hash in jsons:
+            measurement_site = resolved.get(measurement_site_hash)
+            if measurement_site is None:
+                measurement_site = measurement_site_cache.get(measurement_site_hash)
+            if measurement_site is not None:
+                sites[measurement_site_hash] = measurement_site
+
+        missing = [key for key in jsons if key not in sites]
+        if missing:
+            found = {
+                site.measurement_site_hash: site
+                for site in cls.objects.filter(measurement_site_hash__in=missing)
+            }
+            new_sites = cls.insert_many(
+                [
+                    cls.from_json(jsons[key], publication_timestamp)
+                    for key in missing
+                    if key not in found
+                ]
             )
+            cls.create_subtrees(new_sites)
+            found.update((site.measurement_site_hash, site) for site in new_sites)
+
+            # Sites that were created concurrently by another transaction
+            concurrent = [key for key in missing if key not in found]
+            if concurrent:
+                found.update(
+                    (site.measurement_site_hash, site)
+                    for site in cls.objects.filter(measurement_site_hash__in=concurrent)
+                )
+            for key, measurement_site in found.items():
+                measurement_site_cache.add(key, measurement_site)
+            sites.update(found)
+            resolved.update(found)
 
-            for lane_json in lanes:
-                cameras = lane_json.pop('cameras')
-                lane, _ = Lane.objects.get_or_create(
-                    measurement_location=measurement_location,
-                    **lane_json,
+        return [sites[key] for key in hashes]
+
+    @classmethod
+    def get_or_create(
+        cls,
+        measurement_site_json: dict,
+        publication_timestamp: datetime,
+    ) -> Tuple[bool, 'MeasurementSite']:
+        """
+        Get an existing measurement, or create a new one if it does not exist
+        using the given json as an identifying key.
+
+        :return: Tuple where the first element denotes whether the measurement
+                 site was created or not (True == created, False == retrieved).
+                 The second element is the created or retrieved measurement site.
+        """
+        measurement_site_json = cls.canonicalize_json(measurement_site_json)
+
+        # Sites rarely change, so most of them are found in the cache of
+        # this process, without querying the database.
+        measurement_site_hash = cls.hash_json(measurement_site_json)
+        measurement_site = measurement_site_cache.get(measurement_site_hash)
+        if measurement_site is not None:
+            return measurement_site, False
+
+        measurement_site = cls.objects.filter(
+            measurement_site_hash=measurement_site_hash
+        ).first()
+        created = measurement_site is None
+
+        # If we create a new measurement site, then the underlying entities
+        # (locations, lanes and cameras) also need to be created. The
+        # first_publication_timestamp is set to this publication timestamp,
+        # this assumes that the publications are received in the correct order.
+        if created:
+            new_site = cls.from_json(measurement_site_json, publication_timestamp)
+            created = bool(cls.insert_many([new_site]))
+            if created:
+                measurement_site = new_site
+                cls.create_subtrees([measurement_site])
+            else:
+                # The site was created concurrently by another transaction
+                measurement_site = cls.objects.get(
+                    measurement_site_hash=measurement_site_hash
                 )
 
-                for camera_json in cameras:
-                    Camera.objects.get_or_create(
-                        lane=lane,
-                        **camera_json,
-                    )
+        measurement_site_cache.add(measurement_site_hash, measurement_site)
 
         return measurement_site, created
 
@@ -1,21 +1,66 @@
+import io
 import logging
 import os
 from datetime import datetime
 from distutils.util import strtobool
+from functools import lru_cache
+from typing import Iterator
+from xml.etree import ElementTree
 
 import humps
 import xmltodict
+from django.conf import settings
+
+from reistijden_v1.tag_names import TAG_NAMES
 
 logger = logging.getLogger(__name__)
 
 
+def decamelize_name(name: str) -> str:
+    """
+    The snake_case key of an element or attribute name (prefixed with @),
+    like humps.decamelize. Names that are not in the XSD are decamelized
+    once and cached.
+    """
+    try:
+        return TAG_NAMES[name]
+    except KeyError:
+        return _decamelize_name(name)
+
+
+@lru_cache(maxsize=1024)
+def _decamelize_name(name: str) -> str:
+    return humps.decamelize(name)
+
+
+def decamelize_item(path, key, value):
+    """
+    An xmltodict postprocessor that decamelizes the keys while parsing.
+    """
+    return decamelize_name(key), value
+
+
+# The engines that can be used to parse publications, see
+# REISTIJDEN_PARSER_ENGINE
+PARSER_ENGINES = ('xmltodict', 'iterparse')
+
+
 class ReistijdenParser:
-    def __init__(self, xml_str):
+    def __init__(self, xml_str, engine=None):
         super().__init__()
         self.xml_str = xml_str
+        self.engine = engine or settings.REISTIJDEN_PARSER_ENGINE
+        if self.engine not in PARSER_ENGINES:
+            raise ValueError(
+                f'Unknown parser engine {self.engine!r}, '
+                f'use one of {", ".join(PARSER_ENGINES)}'
+            )
 
     def restructure_data(self):
-        data_dict = humps.decamelize(xmltodict.parse(self.xml_str.strip()))
+        if self.engine == "iterparse":
+            return self.restructure_data_iterparse()
+
+        data_dict = xmltodict.parse(self.xml_str.strip(), postprocessor=decamelize_item)
         publication_src = data_dict["amsterdam_travel_times"]["payload_publication"]
         measurements = []
         if "site_measurements" in publication_src:
@@ -29,6 +74,75 @@ class ReistijdenParser:
                     self.measurement_src_to_dict(publication_src["site_measurements"])
                 ]
 
+        return self.publication_src_to_dict(publication_src, measurements)
+
+    def restructure_data_iterparse(self):
+        """
+        Restructure the data like restructure_data does, without building the
+        whole document in memory. The measurements are converted as soon as
+        their siteMeasurements element is parsed, after which the element is
+        discarded.
+        """
+        publication_src = {}
+        measurements = []
+        for key, value in self.iter_publication_elements():
+            if key == "site_measurements":
+                measurements.append(self.measurement_src_to_dict(value))
+            else:
+                publication_src[key] = value
+
+        return self.publication_src_to_dict(publication_src, measurements)
+
+    def iter_publication_elements(self) -> Iterator[tuple]:
+        """
+        Yield the (decamelized) attributes and child elements of the
+        payloadPublication element as key, value pairs, converted to dicts
+        like xmltodict does. Child elements are yielded, and then cleared,
+        as soon as they are parsed.
+        """
+        events = ElementTree.iterparse(
+            io.StringIO(self.xml_str.strip()), events=("start", "end")
+        )
+        path = []
+        for event, element in events:
+            if event == "start":
+                path.append(element.tag)
+                if path == ["amsterdamTravelTimes", "payloadPublication"]:
+                    for name, value in element.attrib.items():
+                        yield decamelize_name(f"@{name}"), value
+                continue
+
+            path.pop()
+            if path == ["amsterdamTravelTimes", "payloadPublication"]:
+                yield decamelize_name(element.tag), self.element_to_dict(element)
+                element.clear()
+
+    def element_to_dict(self, element):
+        """
+        Convert an element to a dict with decamelized keys, in the form
+        xmltodict.parse produces.
+        """
+        result = {
+            decamelize_name(f"@{name}"): value for name, value in element.attrib.items()
+        }
+        for child in element:
+            key = decamelize_name(child.tag)
+            value = self.element_to_dict(child)
+            if key not in result:
+                result[key] = value
+            elif type(result[key]) is list:
+                result[key].append(value)
+            else:
+                result[key] = [result[key], value]
+
+        text = element.text.strip() if element.text else ""
+        if not result:
+            return text or None
+        if text:
+            result["#text"] = text
+        return result
+
+    def publication_src_to_dict(self, publication_src, measurements):
         return {
             "type": publication_src["@type"],
             "reference_id": publication_src["publication_reference"]["@id"],
@@ -0,0 +1,90 @@
+import logging
+import traceback
+from itertools import islice, tee
+from typing import Callable, Iterator, List, NamedTuple, Optional
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from ingress.models import FailedMessage
+
+from contrib.concurrent.futures import submit_in_processes
+from reistijden_v1.consumer import ReistijdenConsumer, parse_publication
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayResult(NamedTuple):
+    """
+    The number of failed messages that were stored, and the number of
+    messages that failed again.
+    """
+
+    replayed: int
+    failed: int
+
+
+def iter_messages(ids: List[int], chunk_size: int) -> Iterator[FailedMessage]:
+    """
+    The failed messages with the ids, fetching `chunk_size` at a time.
+    """
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start : start + chunk_size]
+        yield from FailedMessage.objects.filter(id__in=chunk).order_by(
+            'created_at', 'id'
+        )
+
+
+def replay_failed_messages(
+    queryset: QuerySet,
+    batch_size: int,
+    workers: int,
+    progress: Optional[Callable[[ReplayResult], None]] = None,
+) -> ReplayResult:
+    """
+    Consume failed messages again, oldest first. The messages are parsed
+    in a pool of `workers` processes, while the messages parsed before are
+    stored in transactions of `batch_size` messages.
+
+    Stored messages are removed from the failed queue. Messages that fail
+    again stay in it, with the new error in their consume_fail_info.
+
+    :param progress: Called with the totals after every batch.
+    """
+    consumer = ReistijdenConsumer()
+    ids = list(queryset.order_by('created_at', 'id').values_list('id', flat=True))
+    messages, parsed_messages = tee(iter_messages(ids, batch_size))
+    futures = submit_in_processes(
+        parse_publication,
+        (message.raw_data for message in parsed_messages),
+        workers=workers,
+    )
+    pending = zip(messages, futures)
+
+    replayed = failed = 0
+    while batch := list(islice(pending, batch_size)):
+        measurement_sites = {}
+        with transaction.atomic():
+            for message, future in batch:
+                try:
+                    with transaction.atomic():
+                        # Raises the exception of the parser process, if any
+                        consumer.store_publication(future.result(), measurement_sites)
+                        message.delete()
+                except Exception:
+                    logger.exception(f'Could not replay failed message {message.id}')
+                    # Sites resolved in the rolled back transaction may not exist
+                    measurement_sites.clear()
+                    message.consume_failed_at = timezone.now()
+                    message.consume_fail_info = traceback.format_exc()
+                    message.save(
+                        update_fields=['consume_failed_at', 'consume_fail_info']
+                    )
+                    failed += 1
+                else:
+                    replayed += 1
+
+        if progress:
+            progress(ReplayResult(replayed=replayed, failed=failed))
+
+    return ReplayResult(replayed=replayed, failed=failed)
@@ -77,7 +77,7 @@ class MeasurementSiteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = MeasurementSite
-        exclude = ['measurement_site_json']
+        exclude = ['measurement_site_hash', 'measurement_site_json']
 
 
 class MeasurementSerializer(serializers.ModelSerializer):
@@ -99,41 +99,59 @@ class PublicationSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
     def create(self, validated_data):
-        measurements = validated_data.pop('measurements')
+        """
+        Create the publication and its measurements, level by level with one
+        bulk_create per model, so the number of queries does not depend on
+        the number of measurements. On PostgreSQL bulk_create sets the
+        primary keys, which the next level refers to.
+
+        The measurement sites resolved before in the same transaction can be
+        shared in the `measurement_sites` context, see
+        MeasurementSite.get_or_create_many.
+        """
+        measurements_src = validated_data.pop('measurements')
         publication = Publication.objects.create(**validated_data)
 
-        for measurement_src in measurements:
-            measurement_site_json = measurement_src.pop('measurement_site')
-            measurement_site, _ = MeasurementSite.get_or_create(
-                measurement_site_json,
-                publication.measurement_start_time,
-            )
-
-            measurement = Measurement.objects.create(
-                publication=publication,
-                measurement_site=measurement_site,
-            )
-
-            travel_times = measurement_src.pop('travel_times')
-            for travel_time_src in travel_times:
-                TravelTime.objects.create(measurement=measurement, **travel_time_src)
-
-            individual_travel_times = measurement_src.pop('individual_travel_times')
-            for individual_travel_time_src in individual_travel_times:
-                IndividualTravelTime.objects.create(
-                    measurement=measurement, **individual_travel_time_src
-                )
-
-            traffic_flows = measurement_src.pop('traffic_flows')
-            for traffic_flow_src in traffic_flows:
-                categories = traffic_flow_src.pop('categories')
-                traffic_flow = TrafficFlow.objects.create(
-                    measurement=measurement, **traffic_flow_src
-                )
-
-                for category_src in categories:
-                    TrafficFlowCategoryCount.objects.create(
-                        traffic_flow=traffic_flow, **category_src
-                    )
+        measurement_sites = MeasurementSite.get_or_create_many(
+            [
+                measurement_src.pop('measurement_site')
+                for measurement_src in measurements_src
+            ],
+            publication.measurement_start_time,
+            self.context.get('measurement_sites'),
+        )
+        measurements = [
+            Measurement(publication=publication, measurement_site=measurement_site)
+            for measurement_site in measurement_sites
+        ]
+        Measurement.objects.bulk_create(measurements)
+
+        travel_times = []
+        individual_travel_times = []
+        traffic_flows = []
+        categories = []
+        for measurement, measurement_src in zip(measurements, measurements_src):
+            travel_times += [
+                TravelTime(measurement=measurement, **travel_time_src)
+                for travel_time_src in measurement_src.pop('travel_times')
+            ]
+            individual_travel_times += [
+                IndividualTravelTime(measurement=measurement, **individual_src)
+                for individual_src in measurement_src.pop('individual_travel_times')
+            ]
+            for traffic_flow_src in measurement_src.pop('traffic_flows'):
+                categories_src = traffic_flow_src.pop('categories')
+                traffic_flow = TrafficFlow(measurement=measurement, **traffic_flow_src)
+                traffic_flows.append(traffic_flow)
+                categories += [
+                    TrafficFlowCategoryCount(traffic_flow=traffic_flow, **category_src)
+                    for category_src in categories_src
+                ]
+
+        TravelTime.objects.bulk_create(travel_times)
+        IndividualTravelTime.objects.bulk_create(individual_travel_times)
+        TrafficFlow.objects.bulk_create(traffic_flows)
+        # The traffic flows have primary keys now
+        TrafficFlowCategoryCount.objects.bulk_create(categories)
 
         return publication
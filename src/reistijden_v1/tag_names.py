@@ -0,0 +1,65 @@
+"""
+The snake_case keys of the element and attribute names of the reistijden
+publications, generated from reistijden_v1/amsterdamtraveltimes.xsd by
+the `generate_tag_names` management command. Do not edit by hand.
+"""
+
+TAG_NAMES = {
+    '@count': '@count',
+    '@dataQuality': '@data_quality',
+    '@description': '@description',
+    '@estimationType': '@estimation_type',
+    '@id': '@id',
+    '@index': '@index',
+    '@latitude': '@latitude',
+    '@longitude': '@longitude',
+    '@numberOfInputValuesUsed': '@number_of_input_values_used',
+    '@specificLane': '@specific_lane',
+    '@travelTimeType': '@travel_time_type',
+    '@type': '@type',
+    '@version': '@version',
+    'alarm': 'alarm',
+    'amsterdamTravelTimes': 'amsterdam_travel_times',
+    'camera': 'camera',
+    'category': 'category',
+    'coordinates': 'coordinates',
+    'dataError': 'data_error',
+    'description': 'description',
+    'duration': 'duration',
+    'endDetectionTime': 'end_detection_time',
+    'endOfPeriod': 'end_of_period',
+    'individualTravelTimeData': 'individual_travel_time_data',
+    'lane': 'lane',
+    'laneNumber': 'lane_number',
+    'length': 'length',
+    'licensePlate': 'license_plate',
+    'location': 'location',
+    'locationContainedInItinerary': 'location_contained_in_itinerary',
+    'measuredFlow': 'measured_flow',
+    'measurementEndTime': 'measurement_end_time',
+    'measurementPeriod': 'measurement_period',
+    'measurementSiteName': 'measurement_site_name',
+    'measurementSiteReference': 'measurement_site_reference',
+    'measurementSiteType': 'measurement_site_type',
+    'measurementStartTime': 'measurement_start_time',
+    'numberOfInputValuesUsed': 'number_of_input_values_used',
+    'payloadPublication': 'payload_publication',
+    'publicationReference': 'publication_reference',
+    'publicationTime': 'publication_time',
+    'severity': 'severity',
+    'siteMeasurements': 'site_measurements',
+    'situation': 'situation',
+    'situations': 'situations',
+    'startDetectionTime': 'start_detection_time',
+    'startOfPeriod': 'start_of_period',
+    'status': 'status',
+    'trafficAlarms': 'traffic_alarms',
+    'trafficFlowData': 'traffic_flow_data',
+    'trafficSpeed': 'traffic_speed',
+    'travelTime': 'travel_time',
+    'travelTimeData': 'travel_time_data',
+    'validityPeriod': 'validity_period',
+    'vehicleCategory': 'vehicle_category',
+    'vehicleFlow': 'vehicle_flow',
+    'viewDirection': 'view_direction',
+}
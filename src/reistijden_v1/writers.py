@@ -0,0 +1,219 @@
+from typing import Dict, List, Optional, Type
+
+from django.db import connection
+from django.db.models import Model
+
+from contrib.postgres.copy import copy_rows
+from reistijden_v1.models import (
+    IndividualTravelTime,
+    Measurement,
+    MeasurementSite,
+    Publication,
+    TrafficFlow,
+    TrafficFlowCategoryCount,
+    TravelTime,
+)
+from reistijden_v1.serializers import PublicationSerializer
+
+# The suffix of the temporary tables publications are copied into, see
+# copy_publication
+STAGING_SUFFIX = '_staging'
+
+
+def get_columns(model: Type[Model], parent: str) -> List[str]:
+    """
+    The columns of the model, without the primary key and the parent.
+    """
+    return [
+        field.column
+        for field in model._meta.concrete_fields
+        if not field.primary_key and field.name != parent
+    ]
+
+
+def create_staging_table(cursor, model: Type[Model], keys: List[str], columns):
+    """
+    Create an empty temporary table for the model, with the given integer
+    key columns and the given columns of the model. Returns its quoted name.
+    """
+    quote_name = connection.ops.quote_name
+    table = quote_name(model._meta.db_table + STAGING_SUFFIX)
+    select = ', '.join(
+        [f'NULL::bigint AS {quote_name(key)}' for key in keys]
+        + [quote_name(column) for column in columns]
+    )
+    cursor.execute(
+        f'CREATE TEMPORARY TABLE IF NOT EXISTS {table} ON COMMIT DROP '
+        f'AS SELECT {select} FROM {quote_name(model._meta.db_table)} WITH NO DATA'
+    )
+    cursor.execute(f'TRUNCATE {table}')
+    return table
+
+
+def save_publication(
+    validated_data: dict,
+    measurement_sites: Optional[Dict[str, MeasurementSite]] = None,
+) -> Publication:
+    """
+    Store a validated publication with the serializer, see
+    PublicationSerializer.create.
+
+    :param measurement_sites: The measurement sites resolved before in the
+                              same transaction, see
+                              MeasurementSite.get_or_create_many.
+    """
+    serializer = PublicationSerializer(context={'measurement_sites': measurement_sites})
+    return serializer.create(validated_data)
+
+
+def copy_publication(
+    validated_data: dict,
+    measurement_sites: Optional[Dict[str, MeasurementSite]] = None,
+) -> Publication:
+    """
+    Store a validated publication by copying its flattened rows into
+    temporary staging tables with `COPY ... FROM STDIN`, and inserting
+    them from there with one INSERT ... SELECT per table.
+
+    The rows of the staging tables refer to their parent by its ordinal (position)
+    in the publication. The primary keys of the measurements and traffic
+    flows are allocated from their sequences in the staging tables, which
+    the rows that refer to them are joined on.
+
+    Must run in a transaction, like the consumer does.
+    """
+    data = dict(validated_data)
+    measurements_src = data.pop('measurements')
+    publication = Publication.objects.create(**data)
+
+    measurements = []
+    travel_times = []
+    individual_travel_times = []
+    traffic_flows = []
+    categories = []
+    travel_time_columns = get_columns(TravelTime, 'measurement')
+    individual_columns = get_columns(IndividualTravelTime, 'measurement')
+    traffic_flow_columns = get_columns(TrafficFlow, 'measurement')
+    category_columns = get_columns(TrafficFlowCategoryCount, 'traffic_flow')
+
+    sites = MeasurementSite.get_or_create_many(
+        [measurement_src['measurement_site'] for measurement_src in measurements_src],
+        publication.measurement_start_time,
+        measurement_sites,
+    )
+    for measurement_ordinal, (measurement_src, measurement_site) in enumerate(
+        zip(measurements_src, sites)
+    ):
+        measurements.append((measurement_ordinal, measurement_site.id))
+        travel_times += [
+            (measurement_ordinal, *(src.get(c) for c in travel_time_columns))
+            for src in measurement_src['travel_times']
+        ]
+        individual_travel_times += [
+            (measurement_ordinal, *(src.get(c) for c in individual_columns))
+            for src in measurement_src['individual_travel_times']
+        ]
+        for src in measurement_src['traffic_flows']:
+            traffic_flow_ordinal = len(traffic_flows)
+            traffic_flows.append(
+                (
+                    traffic_flow_ordinal,
+                    measurement_ordinal,
+                    *(src.get(c) for c in traffic_flow_columns),
+                )
+            )
+            categories += [
+                (traffic_flow_ordinal, *(category.get(c) for c in category_columns))
+                for category in src['categories']
+            ]
+
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        staging = {}
+        for model, keys, columns, rows in [
+            (Measurement, ['ordinal', 'id'], ['measurement_site_id'], measurements),
+            (TravelTime, ['measurement_ordinal'], travel_time_columns, travel_times),
+            (
+                IndividualTravelTime,
+                ['measurement_ordinal'],
+                individual_columns,
+                individual_travel_times,
+            ),
+            (
+                TrafficFlow,
+                ['ordinal', 'measurement_ordinal', 'id'],
+                traffic_flow_columns,
+                traffic_flows,
+            ),
+            (
+                TrafficFlowCategoryCount,
+                ['traffic_flow_ordinal'],
+                category_columns,
+                categories,
+            ),
+        ]:
+            table = create_staging_table(cursor, model, keys, columns)
+            staging[model] = table
+            # The ids are allocated below
+            copy_columns = [key for key in keys if key != 'id'] + columns
+            copy_rows(cursor, table, list(map(quote_name, copy_columns)), rows)
+
+        for model in [Measurement, TrafficFlow]:
+            cursor.execute(
+                f"UPDATE {staging[model]} "
+                f"SET id = nextval(pg_get_serial_sequence(%s, 'id'))",
+                [model._meta.db_table],
+            )
+
+        def insert(model, columns, select, joins=''):
+            cursor.execute(
+                f'INSERT INTO {quote_name(model._meta.db_table)} '
+                f'({", ".join(map(quote_name, columns))}) '
+                f'SELECT {select} FROM {staging[model]} AS staging {joins}'
+            )
+
+        join_measurement = (
+            f'JOIN {staging[Measurement]} AS measurement '
+            f'ON measurement.ordinal = staging.measurement_ordinal'
+        )
+        insert(
+            Measurement,
+            ['id', 'publication_id', 'measurement_site_id'],
+            f'id, {publication.id}, measurement_site_id',
+        )
+        for model, columns in [
+            (TravelTime, travel_time_columns),
+            (IndividualTravelTime, individual_columns),
+            (TrafficFlow, traffic_flow_columns),
+        ]:
+            keys = ['id'] if model is TrafficFlow else []
+            insert(
+                model,
+                [*keys, 'measurement_id', *columns],
+                ', '.join(
+                    [f'staging.{key}' for key in keys]
+                    + ['measurement.id']
+                    + [f'staging.{quote_name(column)}' for column in columns]
+                ),
+                join_measurement,
+            )
+        insert(
+            TrafficFlowCategoryCount,
+            ['traffic_flow_id', *category_columns],
+            ', '.join(
+                ['traffic_flow.id']
+                + [f'staging.{quote_name(column)}' for column in category_columns]
+            ),
+            f'JOIN {staging[TrafficFlow]} AS traffic_flow '
+            f'ON traffic_flow.ordinal = staging.traffic_flow_ordinal',
+        )
+
+    return publication
+
+
+# The engines that can be used to store publications, see
+# REISTIJDEN_WRITE_ENGINE
+WRITE_ENGINES = {
+    'orm': save_publication,
+    'copy': copy_publication,
+}
@@ -0,0 +1,80 @@
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple
+
+# The layout of synthetic messages per message type: the number of bytes of
+# an entry and the maximum number of entries (see vlog.decoders)
+MESSAGE_LAYOUTS = {6: (2, 4), 10: (3, 3)}
+
+
+class StageResult(NamedTuple):
+    stage: str
+    lines: int
+    seconds: float
+    # The peak of the memory allocated while running the stage, in bytes
+    peak_memory: int
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.seconds if self.seconds else float('inf')
+
+
+def generate_message(rng: random.Random, message_type: int) -> str:
+    entry_size, max_entries = MESSAGE_LAYOUTS.get(message_type, (1, 4))
+    entry_count = rng.randint(1, max_entries)
+    header = rng.randrange(4096) << 4 | entry_count
+    data = bytes([message_type, header >> 8, header & 0xFF]) + bytes(
+        rng.randrange(256) for _ in range(entry_count * entry_size)
+    )
+    return data.hex().upper()
+
+
+def generate_vlog_lines(
+    count: int,
+    vri_count: int = 10,
+    message_mix: Dict[int, float] = None,
+    start: datetime = datetime(2020, 1, 23),
+    seed: int = 0,
+) -> List[str]:
+    """
+    Generate `count` synthetic V-Log lines in the canonical format, for
+    `vri_count` VRIs, with message types drawn from `message_mix`
+    (message type to relative frequency).
+    """
+    rng = random.Random(seed)
+    message_mix = message_mix or {6: 0.6, 10: 0.4}
+    message_types = rng.choices(list(message_mix), list(message_mix.values()), k=count)
+    lines = []
+    time_ = start
+    for message_type in message_types:
+        time_ += timedelta(milliseconds=rng.randrange(100))
+        lines.append(
+            f'{time_:%Y-%m-%d %H:%M:%S}.{time_.microsecond // 1000:03d},'
+            f'{rng.randrange(vri_count) + 1},{message_type},'
+            f'{generate_message(rng, message_type)}'
+        )
+    return lines
+
+
+def measure(stage: str, function: Callable, batches: List, lines: int) -> StageResult:
+    """
+    Run `function` for every batch, and measure the time it takes and the
+    peak of the memory it allocates. The time is measured in a separate
+    run, since tracing memory allocations slows the code down.
+    """
+    start = time.perf_counter()
+    for batch in batches:
+        function(batch)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        for batch in batches:
+            function(batch)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return StageResult(stage, lines, seconds, peak_memory)
@@ -0,0 +1,233 @@
+import logging
+from itertools import compress
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+import pytz
+from django.db import connection
+
+from vlog.fields import HEX_PATTERN, validate_hex
+from vlog.models import Vlog
+from vlog.parsers import parse_vlog_time, utc_offset
+
+logger = logging.getLogger(__name__)
+
+# Positions of the separators and digits in a canonical V-Log timestamp,
+# i.e. YYYY-MM-DD HH:MM:SS.mmm
+TIME_LENGTH = 23
+TIME_SEPARATORS = {4: '-', 7: '-', 10: ' ', 13: ':', 16: ':', 19: '.'}
+TIME_DIGITS = [i for i in range(TIME_LENGTH) if i not in TIME_SEPARATORS]
+
+MESSAGE_MAX_LENGTH = Vlog._meta.get_field('message').max_length
+MESSAGE_TYPE_MIN, MESSAGE_TYPE_MAX = connection.ops.integer_field_range(
+    Vlog._meta.get_field('message_type').get_internal_type()
+)
+
+# Errors per line number, in the same form as serializer errors per field
+LineErrors = Dict[int, Dict[str, List[str]]]
+
+
+class VlogColumns(NamedTuple):
+    """
+    A batch of V-Log lines as parallel arrays, one element per line.
+    """
+
+    # The number of the line in the parsed batch
+    line_number: np.ndarray
+    # datetime64[us] in UTC
+    time: np.ndarray
+    vri_id: np.ndarray
+    message_type: np.ndarray
+    message: np.ndarray
+    # Lines that could be parsed but hold invalid values. These lines are
+    # not part of the arrays above.
+    errors: LineErrors
+
+
+def canonical_time_mask(values: np.ndarray) -> np.ndarray:
+    """
+    Which of the (stripped) timestamps are in the canonical format.
+    """
+    width = values.dtype.itemsize // np.dtype('U1').itemsize
+    if not len(values) or width < TIME_LENGTH:
+        return np.zeros(len(values), dtype=bool)
+
+    # Look at the timestamps as a matrix of characters
+    chars = values.view('U1').reshape(len(values), width)
+    digits = chars[:, TIME_DIGITS]
+    return (
+        (chars[:, list(TIME_SEPARATORS)] == list(TIME_SEPARATORS.values())).all(axis=1)
+        & ((digits >= '0') & (digits <= '9')).all(axis=1)
+        & (chars[:, TIME_LENGTH:] == '').all(axis=1)
+    )
+
+
+def local_to_utc(local: np.ndarray) -> np.ndarray:
+    """
+    Convert CET/CEST datetime64 values to UTC, computing the offset
+    only once for every distinct hour in the batch.
+    """
+    hours, inverse = np.unique(local.astype('datetime64[h]'), return_inverse=True)
+    offsets = np.array(
+        [utc_offset(str(hour).replace('T', ' ')) for hour in hours],
+        dtype='timedelta64[us]',
+    )
+    return local - offsets[inverse]
+
+
+def parse_times(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse timestamps into UTC datetime64 values. Canonical timestamps are
+    converted in one pass, others are parsed one by one by parse_vlog_time.
+
+    :return: The times and a mask of the values that could be parsed.
+    """
+    array = np.array(values, dtype=str)
+    times = np.zeros(len(values), dtype='datetime64[us]')
+    parsed = np.ones(len(values), dtype=bool)
+
+    canonical = canonical_time_mask(array)
+    try:
+        times[canonical] = local_to_utc(array[canonical].astype('datetime64[us]'))
+    except ValueError:
+        # Well formed, but not existing dates. Parse them one by one.
+        canonical[:] = False
+
+    for i in np.flatnonzero(~canonical):
+        try:
+            date = parse_vlog_time(values[i])
+        except (ValueError, OverflowError):
+            parsed[i] = False
+        else:
+            times[i] = np.datetime64(date.replace(tzinfo=None), 'us')
+
+    return times, parsed
+
+
+def parse_ints(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse integers into an int64 array.
+
+    :return: The integers and a mask of the values that could be parsed.
+    """
+    try:
+        return np.array(values, dtype=np.int64), np.ones(len(values), dtype=bool)
+    except (ValueError, OverflowError):
+        pass
+
+    ints = np.zeros(len(values), dtype=np.int64)
+    parsed = np.ones(len(values), dtype=bool)
+    for i, value in enumerate(values):
+        try:
+            ints[i] = int(value)
+        except (ValueError, OverflowError):
+            parsed[i] = False
+    return ints, parsed
+
+
+def reject_lines(line_numbers: np.ndarray, reason: str, strict: bool):
+    for line_number in line_numbers:
+        logger.error(f'Could not parse V-Log line {line_number}: {reason}')
+    if strict and len(line_numbers):
+        raise ValueError(f'Could not parse V-Log line {line_numbers[0]}: {reason}')
+
+
+def parse_vlog_columns(lines: List[str], start=1, strict=False) -> VlogColumns:
+    """
+    Parse a batch of V-Log lines into columns, without creating
+    an object per line.
+
+    Lines are stripped and empty lines discarded. Lines that can not be
+    parsed are logged and skipped, or raise a ValueError when strict.
+    Lines holding values that do not fit the Vlog table are reported
+    in VlogColumns.errors.
+
+    :param start: The line number of the first line.
+    """
+    lines = [line.strip() for line in lines]
+    line_number = np.arange(start, start + len(lines))
+    non_empty = np.fromiter(map(bool, lines), dtype=bool, count=len(lines))
+    field_count = np.fromiter(
+        (line.count(',') + 1 for line in lines), dtype=np.int64, count=len(lines)
+    )
+
+    malformed = non_empty & (field_count != 4)
+    reject_lines(line_number[malformed], 'expected 4 fields', strict)
+    keep = non_empty & ~malformed
+    line_number = line_number[keep]
+
+    # Split all lines at once, and take every fourth field as a column
+    fields = ','.join(compress(lines, keep)).split(',') if line_number.size else []
+    time, vri_id, message_type, message = (
+        [value.strip() for value in fields[i::4]] for i in range(4)
+    )
+
+    time, time_parsed = parse_times(time)
+    vri_id, vri_id_parsed = parse_ints(vri_id)
+    message_type, message_type_parsed = parse_ints(message_type)
+    message = np.array(message, dtype=str)
+
+    parsed = time_parsed & vri_id_parsed & message_type_parsed
+    reject_lines(line_number[~parsed], 'invalid value', strict)
+
+    # Values must fit the columns of the Vlog table
+    int32 = np.iinfo(np.int32)
+    message_length = np.char.str_len(message)
+    is_hex = np.fromiter(
+        (bool(HEX_PATTERN.match(value)) for value in message.tolist()),
+        dtype=bool,
+        count=len(message),
+    )
+    checks = [
+        (
+            'vri_id',
+            (vri_id < int32.min) | (vri_id > int32.max),
+            f'Ensure this value is between {int32.min} and {int32.max}.',
+        ),
+        (
+            'message_type',
+            (message_type < MESSAGE_TYPE_MIN) | (message_type > MESSAGE_TYPE_MAX),
+            f'Ensure this value is between {MESSAGE_TYPE_MIN} and {MESSAGE_TYPE_MAX}.',
+        ),
+        ('message', message_length == 0, 'This field may not be blank.'),
+        ('message', ~is_hex, validate_hex.message),
+        (
+            'message',
+            message_length > MESSAGE_MAX_LENGTH,
+            f'Ensure this field has no more than {MESSAGE_MAX_LENGTH} characters.',
+        ),
+    ]
+    errors = {}
+    invalid = np.zeros(len(line_number), dtype=bool)
+    for field, mask, error in checks:
+        mask &= parsed
+        invalid |= mask
+        for number in line_number[mask].tolist():
+            errors.setdefault(number, {}).setdefault(field, []).append(error)
+
+    valid = parsed & ~invalid
+    return VlogColumns(
+        line_number=line_number[valid],
+        time=time[valid],
+        vri_id=vri_id[valid].astype(np.int32),
+        message_type=message_type[valid].astype(np.int16),
+        message=message[valid],
+        errors=errors,
+    )
+
+
+def vlog_columns_from_rows(rows: List[dict]) -> VlogColumns:
+    """
+    Convert validated V-Log rows (see vlog.parsers.parse_vlog_line) to columns.
+    """
+    return VlogColumns(
+        line_number=np.arange(1, len(rows) + 1),
+        time=np.array(
+            [row['time'].astimezone(pytz.utc).replace(tzinfo=None) for row in rows],
+            dtype='datetime64[us]',
+        ),
+        vri_id=np.array([row['vri_id'] for row in rows], dtype=np.int32),
+        message_type=np.array([row['message_type'] for row in rows], dtype=np.int16),
+        message=np.array([row['message'] for row in rows], dtype=str),
+        errors={},
+    )
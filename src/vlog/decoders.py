@@ -0,0 +1,160 @@
+import logging
+from typing import Callable, Dict, Iterator, NamedTuple, Tuple, Type
+
+import numpy as np
+from django.db.models import Model
+
+from vlog.columnar import VlogColumns
+from vlog.models import DetectorState, SignalGroupState
+from vlog.writers import WriteResult, copy_lines
+
+logger = logging.getLogger(__name__)
+
+# Decoded messages as columns, by field name
+DecodedColumns = Dict[str, np.ndarray]
+
+# A message starts with the message type (1 byte), the time relative to
+# the V-Log line in tenths of a second (12 bits) and the number of entries
+# (4 bits), followed by the entries.
+HEADER_SIZE = 3
+
+
+class MessageDecoder(NamedTuple):
+    """
+    Decodes the messages of one message type into rows of the model,
+    one row per entry in the message.
+    """
+
+    model: Type[Model]
+    # The number of bytes of an entry
+    entry_size: int
+    # Decodes the entries, an array of (messages, entries, entry_size) bytes
+    decode_entries: Callable[[np.ndarray], DecodedColumns]
+
+    def decode(
+        self,
+        message_type: int,
+        time: np.ndarray,
+        vri_id: np.ndarray,
+        message: np.ndarray,
+    ) -> DecodedColumns:
+        """
+        Decode a batch of messages of the type, in one pass for all messages
+        of the same length. Messages that do not match the type's layout are
+        logged and skipped.
+        """
+        lengths = np.char.str_len(message) // 2
+        parts = []
+        for length in np.unique(lengths).tolist():
+            same = lengths == length
+            entry_count, remainder = divmod(length - HEADER_SIZE, self.entry_size)
+            if entry_count < 1 or remainder:
+                log_undecodable(message_type, length, np.count_nonzero(same))
+                continue
+
+            data = np.frombuffer(
+                bytes.fromhex(''.join(message[same].tolist())), dtype=np.uint8
+            ).reshape(-1, length)
+            header = data[:, 1].astype(np.uint16) << 8 | data[:, 2]
+            valid = (data[:, 0] == message_type) & ((header & 0xF) == entry_count)
+            if not valid.all():
+                log_undecodable(message_type, length, np.count_nonzero(~valid))
+
+            entries = data[valid, HEADER_SIZE:].reshape(
+                -1, entry_count, self.entry_size
+            )
+            parts.append(
+                {
+                    'time': np.repeat(time[same][valid], entry_count),
+                    'vri_id': np.repeat(vri_id[same][valid], entry_count),
+                    'time_delta': np.repeat(header[valid] >> 4, entry_count),
+                    **{
+                        name: values.ravel()
+                        for name, values in self.decode_entries(entries).items()
+                    },
+                }
+            )
+
+        if not parts:
+            return {}
+        return {
+            name: np.concatenate([part[name] for part in parts]) for name in parts[0]
+        }
+
+
+def log_undecodable(message_type: int, length: int, count: int):
+    logger.error(
+        f'Could not decode {count} V-Log messages of type {message_type} '
+        f'and {length} bytes'
+    )
+
+
+def decode_detector_entries(entries: np.ndarray) -> DecodedColumns:
+    # An entry is the detector index and its state
+    return {'detector': entries[..., 0], 'state': entries[..., 1]}
+
+
+def decode_signal_group_entries(entries: np.ndarray) -> DecodedColumns:
+    # An entry is the signal group index and its (16 bit) external state
+    return {
+        'signal_group': entries[..., 0],
+        'state': entries[..., 1].astype(np.uint16) << 8 | entries[..., 2],
+    }
+
+
+# The decoders per message type. Messages of other types are not decoded.
+DECODERS: Dict[int, MessageDecoder] = {
+    6: MessageDecoder(
+        model=DetectorState, entry_size=2, decode_entries=decode_detector_entries
+    ),
+    10: MessageDecoder(
+        model=SignalGroupState,
+        entry_size=3,
+        decode_entries=decode_signal_group_entries,
+    ),
+}
+
+
+def decode_vlog_columns(
+    columns: VlogColumns,
+) -> Iterator[Tuple[Type[Model], DecodedColumns]]:
+    """
+    Decode the messages of a batch of V-Log lines, per message type that
+    has a decoder. Yields the model and the decoded columns.
+    """
+    for message_type, decoder in DECODERS.items():
+        mask = columns.message_type == message_type
+        if not mask.any():
+            continue
+
+        decoded = decoder.decode(
+            message_type,
+            columns.time[mask],
+            columns.vri_id[mask],
+            columns.message[mask],
+        )
+        if decoded:
+            yield decoder.model, decoded
+
+
+def format_copy_column(values: np.ndarray) -> list:
+    if np.issubdtype(values.dtype, np.datetime64):
+        return [
+            f'{value}+00:00'
+            for value in np.datetime_as_string(values, unit='us').tolist()
+        ]
+    return values.tolist()
+
+
+def store_decoded_messages(columns: VlogColumns) -> Dict[str, WriteResult]:
+    """
+    Decode the messages of a batch of V-Log lines and store them in the
+    tables of the decoders. Returns the result per table.
+    """
+    results = {}
+    for model, decoded in decode_vlog_columns(columns):
+        names = list(decoded)
+        values = [format_copy_column(decoded[name]) for name in names]
+        lines = ('\t'.join(map(str, row)) + '\n' for row in zip(*values))
+        results[model._meta.db_table] = copy_lines(lines, model=model, columns=names)
+    return results
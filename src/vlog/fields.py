@@ -0,0 +1,37 @@
+import re
+
+from django.core.validators import RegexValidator
+from django.db import models
+
+# An even number of hexadecimal characters, i.e. a whole number of bytes
+HEX_PATTERN = re.compile(r'^(?:[0-9A-Fa-f]{2})*\Z')
+
+validate_hex = RegexValidator(
+    regex=HEX_PATTERN,
+    message='Enter an even number of hexadecimal characters.',
+    code='invalid_hex',
+)
+
+
+class HexBinaryField(models.CharField):
+    """
+    A hexadecimal string that is stored as the raw bytes, which takes half
+    the space of the string. Values are read as upper case hexadecimal
+    strings. The max_length is the number of hexadecimal characters.
+    """
+
+    default_validators = [validate_hex]
+
+    def db_type(self, connection):
+        return 'bytea'
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is not None:
+            value = connection.Database.Binary(bytes.fromhex(value))
+        return value
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return bytes(value).hex().upper()
@@ -0,0 +1,104 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from api.vlog.serializers import FastVlogListSerializer, VlogSerializer
+from vlog.benchmark import generate_vlog_lines, measure
+from vlog.columnar import parse_vlog_columns
+from vlog.parsers import parse_vlog_line, parse_vlog_lines
+from vlog.writers import bulk_create_vlogs, copy_vlog_columns, copy_vlogs
+
+
+def parse_message_mix(value: str) -> dict:
+    """
+    Parse a message mix like '6=0.6,10=0.4'
+    """
+    message_mix = {}
+    for item in value.split(','):
+        message_type, weight = item.split('=')
+        message_mix[int(message_type)] = float(weight)
+    return message_mix
+
+
+def rolled_back(function):
+    """
+    Run the function in a transaction that is rolled back, so the database
+    is left as it was and the stages do not see each other's lines.
+    """
+
+    def wrapper(*args):
+        with transaction.atomic():
+            function(*args)
+            transaction.set_rollback(True)
+
+    return wrapper
+
+
+def validate_rows(rows):
+    serializer = VlogSerializer(data=rows, many=True)
+    serializer.is_valid(raise_exception=True)
+
+
+def validate_rows_fast(rows):
+    serializer = FastVlogListSerializer(child=VlogSerializer(), data=rows)
+    serializer.is_valid(raise_exception=True)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the lines per second and peak memory of each stage of the '
+        'V-Log ingestion with synthetic lines. The lines are written in '
+        'transactions that are rolled back, but run it against a throwaway '
+        'database nonetheless.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vri-count', type=int, default=10)
+        parser.add_argument(
+            '--message-mix',
+            type=parse_message_mix,
+            default='6=0.6,10=0.4',
+            help='Relative frequencies per message type, e.g. 6=0.6,10=0.4',
+        )
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--batches', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        batch_size, batch_count = options['batch_size'], options['batches']
+        lines = generate_vlog_lines(
+            batch_size * batch_count,
+            vri_count=options['vri_count'],
+            message_mix=options['message_mix'],
+            seed=options['seed'],
+        )
+        batches = [lines[i : i + batch_size] for i in range(0, len(lines), batch_size)]
+        texts = ['\n'.join(batch) for batch in batches]
+        rows = [parse_vlog_lines(text) for text in texts]
+        columns = [parse_vlog_columns(batch) for batch in batches]
+
+        results = [
+            measure(
+                'parse_vlog_line',
+                lambda batch: [parse_vlog_line(line) for line in batch],
+                batches,
+                len(lines),
+            ),
+            measure('parse_vlog_lines', parse_vlog_lines, texts, len(lines)),
+            measure('parse_vlog_columns', parse_vlog_columns, batches, len(lines)),
+            measure('VlogSerializer', validate_rows, rows, len(lines)),
+            measure('FastVlogListSerializer', validate_rows_fast, rows, len(lines)),
+            measure('bulk_create', rolled_back(bulk_create_vlogs), rows, len(lines)),
+            measure('copy', rolled_back(copy_vlogs), rows, len(lines)),
+            measure(
+                'copy columns', rolled_back(copy_vlog_columns), columns, len(lines)
+            ),
+        ]
+
+        self.stdout.write(
+            f'{"stage":<24} | {"lines/second":>12} | {"peak memory (MiB)":>17}'
+        )
+        for result in results:
+            self.stdout.write(
+                f'{result.stage:<24} | {result.lines_per_second:>12.0f} | '
+                f'{result.peak_memory / 2**20:>17.1f}'
+            )
@@ -0,0 +1,39 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from vlog.spool import drain_spool
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Store the V-Log bodies spooled in VLOG_SPOOL_DIR in the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Stop when the spool is empty instead of waiting for new files',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait before looking for new files',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.VLOG_SPOOL_DIR:
+            raise CommandError('VLOG_SPOOL_DIR is not configured')
+
+        while True:
+            count = drain_spool(settings.VLOG_SPOOL_DIR, settings.VLOG_CHUNK_SIZE)
+            if count:
+                logger.info(f'Stored {count} spooled V-Log lines')
+            if options['once']:
+                break
+            if not count:
+                time.sleep(options['interval'])
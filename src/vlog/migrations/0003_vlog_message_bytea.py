@@ -0,0 +1,51 @@
+from django.db import migrations
+
+import vlog.fields
+
+HEX_MESSAGE = r'^([0-9A-Fa-f]{2})*$'
+
+
+def check_hex_messages(apps, schema_editor):
+    # Messages were stored without validating them as hexadecimal, and
+    # decode() can not convert the ones that are not. Refuse to migrate
+    # instead of dropping them.
+    Vlog = apps.get_model('vlog', 'Vlog')
+    invalid = Vlog.objects.exclude(message__regex=HEX_MESSAGE).count()
+    if invalid:
+        raise ValueError(
+            f'{invalid} V-Log messages are not hexadecimal and can not be '
+            f'converted to bytea. Repair or remove the rows of vlog_vlog with '
+            f"message !~ '{HEX_MESSAGE}' and migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vlog', '0002_alter_vlog_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            check_hex_messages, reverse_code=migrations.RunPython.noop
+        ),
+        # Converting the hexadecimal strings in place also converts the
+        # existing chunks of the hypertable.
+        migrations.RunSQL(
+            sql=(
+                'ALTER TABLE vlog_vlog ALTER COLUMN message TYPE bytea '
+                "USING decode(message, 'hex')"
+            ),
+            reverse_sql=(
+                'ALTER TABLE vlog_vlog ALTER COLUMN message TYPE varchar(255) '
+                "USING upper(encode(message, 'hex'))"
+            ),
+            state_operations=[
+                migrations.AlterField(
+                    model_name='vlog',
+                    name='message',
+                    field=vlog.fields.HexBinaryField(max_length=255),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+# Keep the first stored copy of every line
+DELETE_DUPLICATES = """
+DELETE FROM vlog_vlog WHERE id IN (
+    SELECT id FROM (
+        SELECT id, row_number() OVER (
+            PARTITION BY time, vri_id, message_type, message ORDER BY id
+        ) AS copy_number
+        FROM vlog_vlog
+    ) AS copies
+    WHERE copy_number > 1
+)
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vlog', '0003_vlog_message_bytea'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DELETE_DUPLICATES, reverse_sql=migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='vlog',
+            constraint=models.UniqueConstraint(
+                fields=('time', 'vri_id', 'message_type', 'message'),
+                name='vlog_unique_line',
+            ),
+        ),
+    ]
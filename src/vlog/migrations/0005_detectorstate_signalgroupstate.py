@@ -0,0 +1,44 @@
+# Generated by Django 3.2.19 on 2026-10-18 08:35
+
+import contrib.timescale.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vlog', '0004_vlog_unique_line'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DetectorState',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('time', contrib.timescale.fields.TimescaleDateTimeField(interval='1 week')),
+                ('vri_id', models.IntegerField()),
+                ('time_delta', models.PositiveSmallIntegerField()),
+                ('detector', models.PositiveSmallIntegerField()),
+                ('state', models.PositiveSmallIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SignalGroupState',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('time', contrib.timescale.fields.TimescaleDateTimeField(interval='1 week')),
+                ('vri_id', models.IntegerField()),
+                ('time_delta', models.PositiveSmallIntegerField()),
+                ('signal_group', models.PositiveSmallIntegerField()),
+                ('state', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='signalgroupstate',
+            constraint=models.UniqueConstraint(fields=('time', 'vri_id', 'time_delta', 'signal_group', 'state'), name='vlog_unique_signal_group_state'),
+        ),
+        migrations.AddConstraint(
+            model_name='detectorstate',
+            constraint=models.UniqueConstraint(fields=('time', 'vri_id', 'time_delta', 'detector', 'state'), name='vlog_unique_detector_state'),
+        ),
+    ]
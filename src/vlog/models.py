@@ -3,6 +3,7 @@ from django.utils import timezone
 from django_extensions.db.models import TimeStampedModel
 
 from contrib.timescale.fields import TimescaleDateTimeField
+from vlog.fields import HexBinaryField
 
 
 class Vlog(TimeStampedModel):
@@ -15,5 +16,61 @@ class Vlog(TimeStampedModel):
     # Max 255 types can exist
     message_type = models.PositiveSmallIntegerField()
 
-    # The message itself.
-    message = models.CharField(max_length=255)
+    # The message itself, a hexadecimal string stored as bytes.
+    message = HexBinaryField(max_length=255)
+
+    class Meta(TimeStampedModel.Meta):
+        # Collectors retry uploads, a line is only stored once
+        constraints = [
+            models.UniqueConstraint(
+                fields=['time', 'vri_id', 'message_type', 'message'],
+                name='vlog_unique_line',
+            ),
+        ]
+
+
+class DetectorState(models.Model):
+    """
+    A detector state change, decoded from a V-Log message of type 6.
+    """
+
+    time = TimescaleDateTimeField(interval="1 week")
+    vri_id = models.IntegerField()
+
+    # The time of the change relative to the V-Log line, in tenths of a second
+    time_delta = models.PositiveSmallIntegerField()
+
+    detector = models.PositiveSmallIntegerField()
+    state = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['time', 'vri_id', 'time_delta', 'detector', 'state'],
+                name='vlog_unique_detector_state',
+            ),
+        ]
+
+
+class SignalGroupState(models.Model):
+    """
+    An external signal group state change, decoded from a V-Log message
+    of type 10.
+    """
+
+    time = TimescaleDateTimeField(interval="1 week")
+    vri_id = models.IntegerField()
+
+    # The time of the change relative to the V-Log line, in tenths of a second
+    time_delta = models.PositiveSmallIntegerField()
+
+    signal_group = models.PositiveSmallIntegerField()
+    state = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['time', 'vri_id', 'time_delta', 'signal_group', 'state'],
+                name='vlog_unique_signal_group_state',
+            ),
+        ]
@@ -1,10 +1,66 @@
 import logging
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator, List
 
 import pytz
 from dateutil.parser import parse
 
 logger = logging.getLogger(__name__)
 
+# V-Log timestamps without an explicit offset are in local (Dutch) time
+VLOG_TIMEZONE = pytz.timezone('CET')
+
+# The canonical V-Log timestamp format: YYYY-MM-DD HH:MM:SS.mmm
+VLOG_TIME_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}')
+
+
+@lru_cache(maxsize=1024)
+def utc_offset(hour: str) -> timedelta:
+    """
+    The CET/CEST offset of a 'YYYY-MM-DD HH' hour. The offset only changes
+    on the hour, so it is computed once per hour instead of once per line.
+    Ambiguous and non-existent hours are resolved like `localize` does.
+    """
+    date = datetime.strptime(hour, '%Y-%m-%d %H')
+    return VLOG_TIMEZONE.utcoffset(date, is_dst=False)
+
+
+@lru_cache(maxsize=4096)
+def _parse_second(second: str) -> datetime:
+    """
+    Parse a 'YYYY-MM-DD HH:MM:SS' prefix into a UTC datetime. Consecutive
+    lines mostly share the same second, so the result is memoized.
+    """
+    date = datetime(
+        int(second[0:4]),
+        int(second[5:7]),
+        int(second[8:10]),
+        int(second[11:13]),
+        int(second[14:16]),
+        int(second[17:19]),
+    )
+    return (date - utc_offset(second[:13])).replace(tzinfo=pytz.utc)
+
+
+def parse_vlog_time(value: str) -> datetime:
+    """
+    Parse a V-Log timestamp into a UTC datetime. Timestamps without an
+    explicit offset are interpreted as CET/CEST.
+
+    The canonical format (e.g. 2020-01-23 00:00:02.220) is parsed without
+    dateutil, other formats fall back on `dateutil.parser.parse`.
+    """
+    if VLOG_TIME_PATTERN.fullmatch(value):
+        return _parse_second(value[:19]).replace(microsecond=int(value[20:]) * 1000)
+
+    date = parse(value)
+    if not date.tzinfo:
+        date = VLOG_TIMEZONE.localize(date)
+    return date.astimezone(pytz.utc)
+
 
 def parse_vlog_line(data: str):
     """
@@ -16,36 +72,59 @@ def parse_vlog_line(data: str):
         2020-01-23 00:00:02.220,102,10,0A0171010063
     """
     date, vri_id, message_type, message = data.split(',')
-    date = parse(date.strip())
-    if not date.tzinfo:
-        date.replace(tzinfo=pytz.timezone('CET'))
-    date = date.astimezone(pytz.utc)
     return dict(
-        time=date,
+        time=parse_vlog_time(date.strip()),
         vri_id=int(vri_id),
         message_type=int(message_type),
         message=message.strip(),
     )
 
 
-def parse_vlog_lines(data: str, strict=False):
+def iter_vlog_lines(lines: Iterable[str], strict=False) -> Iterator[dict]:
     """
-    Parse a multiline string of V-Log lines.
-    Logs must be split by newlines
+    Lazily parse an iterable of V-Log lines.
 
     Note:
     Lines will be stripped of leading and trailing spaces
     and empty lines discarded.
     """
-    chunks = data.splitlines()
-    lines = list(filter(None, [x.strip() for x in chunks]))
-    data = []
     for line in lines:
+        line = line.strip()
+        if not line:
+            continue
         try:
-            data.append(parse_vlog_line(line))
+            yield parse_vlog_line(line)
         except ValueError as e:
             logger.exception(e)
             if strict:
                 raise
-            continue
-    return data
+
+
+def parse_vlog_lines(data: str, strict=False):
+    """
+    Parse a multiline string of V-Log lines.
+    Logs must be split by newlines
+
+    Note:
+    Lines will be stripped of leading and trailing spaces
+    and empty lines discarded.
+    """
+    return list(iter_vlog_lines(data.splitlines(), strict=strict))
+
+
+def parse_vlog_chunk(lines: List[str], start=1, strict=False) -> List[dict]:
+    """
+    Parse a chunk of V-Log lines, with the same signature as
+    vlog.columnar.parse_vlog_columns so both can be used with
+    contrib.concurrent.futures.map_in_processes.
+    """
+    return list(iter_vlog_lines(lines, strict=strict))
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """
+    Split an iterable into lists of at most `size` items.
+    """
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,112 @@
+import logging
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import BinaryIO, List
+
+from django.conf import settings
+from django.db import transaction
+
+from vlog.columnar import parse_vlog_columns
+from vlog.decoders import store_decoded_messages
+from vlog.parsers import chunked
+from vlog.writers import copy_vlog_columns
+
+logger = logging.getLogger(__name__)
+
+# Spooled bodies are written to TMP_DIR first and then moved into the spool
+# directory, so the drain worker never sees partially written files. Files
+# that can not be stored are moved to FAILED_DIR.
+SPOOL_SUFFIX = '.vlog'
+TMP_DIR = 'tmp'
+FAILED_DIR = 'failed'
+
+
+class SpoolFileError(ValueError):
+    pass
+
+
+def fsync_directory(directory: Path):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def spool_body(stream: BinaryIO, directory: str) -> Path:
+    """
+    Durably write a V-Log body to the spool directory. The file names
+    sort in the order in which the bodies were received.
+    """
+    directory = Path(directory)
+    (directory / TMP_DIR).mkdir(parents=True, exist_ok=True)
+
+    name = f'{time.time_ns():020d}-{uuid.uuid4().hex}{SPOOL_SUFFIX}'
+    tmp_path = directory / TMP_DIR / name
+    try:
+        with open(tmp_path, 'wb') as file:
+            shutil.copyfileobj(stream, file)
+            file.flush()
+            os.fsync(file.fileno())
+    except BaseException:
+        # E.g. the client disconnected while sending the body
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    path = directory / name
+    os.rename(tmp_path, path)
+    fsync_directory(directory)
+    return path
+
+
+def spooled_files(directory: str) -> List[Path]:
+    """
+    The spooled bodies, oldest first.
+    """
+    return sorted(Path(directory).glob(f'*{SPOOL_SUFFIX}'))
+
+
+def store_spool_file(path: Path, chunk_size: int) -> int:
+    """
+    Store the V-Log lines of a spooled body in chunks of `chunk_size` lines,
+    in a single transaction. The file is removed once the lines are stored.
+    Returns the number of lines that were not stored before.
+
+    Lines that can not be parsed are logged and skipped, like the API does.
+    Lines holding invalid values reject the whole file with a SpoolFileError.
+    """
+    count = 0
+    with transaction.atomic():
+        with open(path, encoding='utf-8') as file:
+            for index, chunk in enumerate(chunked(file, chunk_size)):
+                columns = parse_vlog_columns(chunk, start=index * chunk_size + 1)
+                if columns.errors:
+                    raise SpoolFileError(f'Invalid V-Log lines: {columns.errors}')
+                count += copy_vlog_columns(columns).created
+                if settings.VLOG_DECODE_MESSAGES:
+                    store_decoded_messages(columns)
+
+    path.unlink()
+    return count
+
+
+def drain_spool(directory: str, chunk_size: int) -> int:
+    """
+    Store all spooled bodies, oldest first. Returns the number of lines stored.
+
+    Files that can not be stored are moved to the FAILED_DIR subdirectory.
+    Database errors are raised, leaving the remaining files in the spool.
+    """
+    count = 0
+    for path in spooled_files(directory):
+        try:
+            count += store_spool_file(path, chunk_size)
+        except (SpoolFileError, UnicodeDecodeError):
+            logger.exception(f'Could not store spooled V-Log file {path.name}')
+            failed_dir = path.parent / FAILED_DIR
+            failed_dir.mkdir(exist_ok=True)
+            os.rename(path, failed_dir / path.name)
+    return count
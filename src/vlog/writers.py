@@ -0,0 +1,130 @@
+from typing import Iterable, Iterator, List, NamedTuple, Type
+
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Model
+from django.db.models.sql import InsertQuery
+from django.utils import timezone
+
+from contrib.postgres.copy import CopyStream
+from vlog.columnar import VlogColumns
+from vlog.models import Vlog
+
+# The columns written by the COPY engine, in order
+COPY_COLUMNS = ['created', 'modified', 'time', 'vri_id', 'message_type', 'message']
+
+# The suffix of the temporary tables lines are copied into before they are
+# merged into the table of the model, see copy_lines
+COPY_STAGING_SUFFIX = '_staging'
+
+# The prefix of a bytea value in the hex format, escaped for the COPY text format
+COPY_BYTEA_PREFIX = '\\\\x'
+
+
+class WriteResult(NamedTuple):
+    """
+    The number of V-Log lines that were stored, and the number of lines
+    that were skipped because they were already stored.
+    """
+
+    created: int
+    duplicates: int
+
+
+def iter_copy_lines(rows: Iterable[dict]) -> Iterator[str]:
+    """
+    Format parsed V-Log rows as lines in the COPY text format. The messages
+    must be validated hexadecimal strings, which need no escaping.
+    """
+    now = timezone.now().isoformat()
+    for row in rows:
+        yield (
+            f"{now}\t{now}\t{row['time'].isoformat()}\t{row['vri_id']}\t"
+            f"{row['message_type']}\t{COPY_BYTEA_PREFIX}{row['message']}\n"
+        )
+
+
+def copy_lines(
+    lines: Iterable[str], model: Type[Model] = Vlog, columns: List[str] = COPY_COLUMNS
+) -> WriteResult:
+    """
+    Stream lines in the COPY text format into a temporary staging table
+    using `COPY ... FROM STDIN`, and merge them into the table of the model
+    with `INSERT ... ON CONFLICT DO NOTHING`, which skips lines that are
+    already stored.
+    """
+    quote_name = connection.ops.quote_name
+    table = quote_name(model._meta.db_table)
+    staging_table = quote_name(model._meta.db_table + COPY_STAGING_SUFFIX)
+    columns = ', '.join(quote_name(name) for name in columns)
+    stream = CopyStream(lines)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TEMPORARY TABLE IF NOT EXISTS {staging_table} ON COMMIT DROP '
+            f'AS SELECT {columns} FROM {table} WITH NO DATA'
+        )
+        cursor.execute(f'TRUNCATE {staging_table}')
+        cursor.copy_expert(f'COPY {staging_table} ({columns}) FROM STDIN', stream)
+        cursor.execute(
+            f'INSERT INTO {table} ({columns}) '
+            f'SELECT {columns} FROM {staging_table} ON CONFLICT DO NOTHING'
+        )
+        created = cursor.rowcount
+    return WriteResult(created=created, duplicates=stream.line_count - created)
+
+
+def bulk_create_vlogs(rows: Iterable[dict]) -> WriteResult:
+    """
+    Store parsed V-Log rows with a single multi-row INSERT, which skips
+    rows that are already stored (like `bulk_create(ignore_conflicts=True)`,
+    but counting the rows that were created).
+    """
+    objs = [Vlog(**row) for row in rows]
+    if not objs:
+        return WriteResult(created=0, duplicates=0)
+
+    fields = [field for field in Vlog._meta.concrete_fields if not field.primary_key]
+    query = InsertQuery(Vlog, ignore_conflicts=True)
+    query.insert_values(fields, objs)
+    created = 0
+    with connection.cursor() as cursor:
+        for sql, params in query.get_compiler(connection=connection).as_sql():
+            cursor.execute(sql, params)
+            created += cursor.rowcount
+    return WriteResult(created=created, duplicates=len(objs) - created)
+
+
+def copy_vlogs(rows: Iterable[dict]) -> WriteResult:
+    """
+    Store parsed V-Log rows with `COPY ... FROM STDIN`, without
+    creating model instances.
+    """
+    return copy_lines(iter_copy_lines(rows))
+
+
+def copy_vlog_columns(columns: VlogColumns) -> WriteResult:
+    """
+    Store a columnar batch of V-Log lines with `COPY ... FROM STDIN`.
+    """
+    now = timezone.now().isoformat()
+    times = np.datetime_as_string(columns.time, unit='us')
+    return copy_lines(
+        f"{now}\t{now}\t{time}+00:00\t{vri_id}\t{message_type}\t"
+        f"{COPY_BYTEA_PREFIX}{message}\n"
+        for time, vri_id, message_type, message in zip(
+            times.tolist(),
+            columns.vri_id.tolist(),
+            columns.message_type.tolist(),
+            columns.message.tolist(),
+        )
+    )
+
+
+# The engines that can be used to store V-Log rows, see VLOG_WRITE_ENGINE
+WRITE_ENGINES = {
+    'orm': bulk_create_vlogs,
+    'copy': copy_vlogs,
+}
+
+# The engine that parses and stores V-Log lines as columns, see VlogColumns
+COLUMNAR_ENGINE = 'columnar'
@@ -1,8 +1,13 @@
+import gzip
+
 import pytest
+import zstandard
+from django.db import connection
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 
-from vlog.models import Vlog
+from vlog.models import DetectorState, SignalGroupState, Vlog
 from vlog.parsers import parse_vlog_line
 
 
@@ -83,6 +88,313 @@ class TestVlogApi:
             assert row.message_type == vlog["message_type"]
             assert row.message == vlog["message"]
 
+    @override_settings(VLOG_STREAMING=True, VLOG_CHUNK_SIZE=2)
+    def test_create_vlog_streaming(self, authd_api_client):
+        data = [
+            "2020-01-23 00:00:00.399 ,101, 6, 0600A10500",
+            "",
+            "2020-01-23 00:00:02.220,102 ,10,0A0171010063",
+            "2020-01-23 00:00:02.941, 103,10,0A06120C0060160061",
+            "2020-01-23 00:00:03.521, 101 , 10, 0A0281010465",
+            "2020-01-23 00:00:03.552, 104 , 10, 0A0281010465",
+        ]
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(url, "\r\n".join(data), format="txt")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Vlog.objects.count() == 5
+        assert sorted(Vlog.objects.values_list("vri_id", flat=True)) == [
+            101,
+            101,
+            102,
+            103,
+            104,
+        ]
+
+    @pytest.mark.parametrize("engine", ["copy", "columnar"])
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_create_vlog_copy(self, authd_api_client, settings, streaming, engine):
+        settings.VLOG_STREAMING = streaming
+        data = [
+            "2020-01-23 00:00:00.399 ,101, 6, 0600A10500",
+            "2020-01-23 00:00:02.220,102 ,10,0A0171010063",
+            "2020-01-23 00:00:02.941, 103,10,0A06120C0060160061",
+        ]
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(
+            f"{url}?engine={engine}", "\n".join(data), format="txt"
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Vlog.objects.count() == 3
+        for line in data:
+            vlog = parse_vlog_line(line)
+            row = Vlog.objects.get(vri_id=vlog["vri_id"])
+            assert row.time == vlog["time"]
+            assert row.message_type == vlog["message_type"]
+            assert row.message == vlog["message"]
+            assert row.created is not None
+
+    @override_settings(VLOG_FAST_VALIDATION=True)
+    def test_create_vlog_fast_validation(
+        self, django_assert_num_queries, authd_api_client
+    ):
+        data = [
+            "2020-01-23 00:00:00.399 ,101, 6, 0600A10500",
+            "2020-01-23 00:00:02.220,102 ,10,0A0171010063",
+        ]
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        with django_assert_num_queries(1):
+            response = authd_api_client.post(url, "\n".join(data), format="txt")
+            assert response.status_code == status.HTTP_201_CREATED
+
+        assert Vlog.objects.count() == 2
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            "2020-01-23 00:00:00.399,101,6,0600A10500",
+            "2020-01-23 00:00:00.399,101,40000,0600A10500",
+            "2020-01-23 00:00:00.399,3000000000,-1,0600A10500",
+            "2020-01-23 00:00:00.399,101,6," + "A" * 256,
+            "2020-01-23 00:00:00.399,101,6," + "A" * 257,
+            "2020-01-23 00:00:00.399,101,6,0600X10500",
+        ],
+    )
+    def test_create_vlog_fast_validation_errors(self, authd_api_client, settings, data):
+        """
+        The fast validation should report the same errors as the serializer does
+        """
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        body = "\n".join(["2020-01-23 00:00:00.399,101,6,0600A10500", data])
+
+        settings.VLOG_FAST_VALIDATION = False
+        expected = authd_api_client.post(url, body, format="txt")
+        Vlog.objects.all().delete()
+
+        settings.VLOG_FAST_VALIDATION = True
+        response = authd_api_client.post(url, body, format="txt")
+
+        assert response.status_code == expected.status_code
+        assert response.content == expected.content
+
+    def test_create_vlog_columnar_errors(self, authd_api_client):
+        data = [
+            "2020-01-23 00:00:00.399,101,6,0600A10500",
+            "2020-01-23 00:00:02.220,102,40000,0A0171010063",
+        ]
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(
+            f"{url}?engine=columnar", "\n".join(data), format="txt"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert list(response.json()) == ["2"]
+        assert Vlog.objects.count() == 0
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    @pytest.mark.parametrize("engine", ["orm", "columnar"])
+    def test_create_vlog_parallel(self, authd_api_client, settings, streaming, engine):
+        settings.VLOG_STREAMING = streaming
+        settings.VLOG_PARSE_WORKERS = 2
+        settings.VLOG_CHUNK_SIZE = 2
+        data = [
+            "2020-01-23 00:00:00.399,101,6,0600A10500",
+            "2020-01-23 00:00:02.220,102,10,0A0171010063",
+            "2020-01-23 00:00:02.941,103,10,0A06120C0060160061",
+            "2020-01-23 00:00:03.521,104,10,0A0281010465",
+            "2020-01-23 00:00:03.552,105,10,0A0281010465",
+        ]
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(
+            f"{url}?engine={engine}", "\n".join(data), format="txt"
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert sorted(Vlog.objects.values_list("vri_id", flat=True)) == [
+            101,
+            102,
+            103,
+            104,
+            105,
+        ]
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    @pytest.mark.parametrize("engine", ["orm", "columnar"])
+    def test_create_vlog_parallel_invalid_chunk(
+        self, authd_api_client, settings, streaming, engine
+    ):
+        settings.VLOG_STREAMING = streaming
+        settings.VLOG_PARSE_WORKERS = 2
+        settings.VLOG_CHUNK_SIZE = 1
+        data = ["2020-01-23 00:00:00.399,101,6,0600A10500"] * 10
+        data[1] = "2020-01-23 00:00:02.220,102,40000,0A0171010063"
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(
+            f"{url}?engine={engine}", "\n".join(data), format="txt"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Vlog.objects.count() == 0
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    @pytest.mark.parametrize("engine", ["orm", "copy", "columnar"])
+    def test_create_vlog_duplicates(
+        self, authd_api_client, settings, streaming, engine
+    ):
+        settings.VLOG_STREAMING = streaming
+        data = [
+            "2020-01-23 00:00:00.399,101,6,0600A10500",
+            "2020-01-23 00:00:02.220,102,10,0A0171010063",
+            "2020-01-23 00:00:02.220,102,10,0A0171010063",
+        ]
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(
+            f"{url}?engine={engine}", "\n".join(data), format="txt"
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == {"created": 2, "duplicates": 1}
+
+        data.append("2020-01-23 00:00:02.941,103,10,0A06120C0060160061")
+        response = authd_api_client.post(
+            f"{url}?engine={engine}", "\n".join(data), format="txt"
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == {"created": 1, "duplicates": 3}
+        assert Vlog.objects.count() == 3
+
+    def test_create_vlog_single_duplicate(self, authd_api_client):
+        data = {
+            "time": "2020-01-23T00:00:00.399+01:00",
+            "vri_id": 101,
+            "message_type": 6,
+            "message": "0600A10500",
+        }
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(url, data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == {**data, "time": "2020-01-22T23:00:00.399000Z"}
+
+        response = authd_api_client.post(url, data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Vlog.objects.count() == 1
+
+    def test_create_vlog_list(self, authd_api_client):
+        data = {
+            "time": "2020-01-23T00:00:00.399+01:00",
+            "vri_id": 101,
+            "message_type": 6,
+            "message": "0600A10500",
+        }
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(url, [data, data], format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == {"created": 1, "duplicates": 1}
+        assert Vlog.objects.count() == 1
+
+    @pytest.mark.parametrize("engine", ["orm", "copy", "columnar"])
+    def test_create_vlog_binary_message(self, authd_api_client, engine):
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(
+            f"{url}?engine={engine}",
+            "2020-01-23 00:00:00.399,101,6,0600a10500",
+            format="txt",
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT message FROM vlog_vlog")
+            assert bytes(cursor.fetchone()[0]) == bytes.fromhex("0600A10500")
+        assert Vlog.objects.get(message="0600A10500").message == "0600A10500"
+
+    @pytest.mark.parametrize("engine", ["orm", "columnar"])
+    def test_create_vlog_decoded(self, authd_api_client, settings, engine):
+        settings.VLOG_DECODE_MESSAGES = True
+        data = [
+            "2020-01-23 00:00:00.399,101,6,0600A10500",
+            "2020-01-23 00:00:02.941,103,10,0A06120C0060160061",
+        ]
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(
+            f"{url}?engine={engine}", "\n".join(data), format="txt"
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert list(DetectorState.objects.values_list("vri_id", "detector")) == [
+            (101, 5)
+        ]
+        assert sorted(
+            SignalGroupState.objects.values_list("signal_group", flat=True)
+        ) == [12, 22]
+
+    def test_create_vlog_unknown_engine(self, authd_api_client):
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(
+            f"{url}?engine=foo",
+            "2020-01-23 00:00:00.399,101,6,0600A10500",
+            format="txt",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "engine" in response.data
+        assert Vlog.objects.count() == 0
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    @pytest.mark.parametrize(
+        "encoding, compress",
+        [("gzip", gzip.compress), ("zstd", zstandard.compress)],
+    )
+    def test_create_vlog_compressed(
+        self, authd_api_client, settings, streaming, encoding, compress
+    ):
+        settings.VLOG_STREAMING = streaming
+        data = [
+            "2020-01-23 00:00:00.399,101,6,0600A10500",
+            "2020-01-23 00:00:02.220,102,10,0A0171010063",
+        ]
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(
+            url,
+            compress("\n".join(data).encode()),
+            content_type="text/plain",
+            HTTP_CONTENT_ENCODING=encoding,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert sorted(Vlog.objects.values_list("vri_id", flat=True)) == [101, 102]
+
+    @pytest.mark.parametrize(
+        "body, encoding, status_code",
+        [
+            (gzip.compress(b"x" * 1000), "gzip", status.HTTP_400_BAD_REQUEST),
+            (b"not gzipped", "gzip", status.HTTP_400_BAD_REQUEST),
+            (b"not zstd", "zstd", status.HTTP_400_BAD_REQUEST),
+            (zstandard.compress(b"0" * 80)[:-2], "zstd", status.HTTP_400_BAD_REQUEST),
+            (b"compressed", "br", status.HTTP_415_UNSUPPORTED_MEDIA_TYPE),
+        ],
+    )
+    def test_create_vlog_compressed_errors(
+        self, authd_api_client, settings, body, encoding, status_code
+    ):
+        settings.MAX_DECOMPRESSED_BODY_SIZE = 100
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(
+            url, body, content_type="text/plain", HTTP_CONTENT_ENCODING=encoding
+        )
+
+        assert response.status_code == status_code
+        assert Vlog.objects.count() == 0
+
+    def test_create_vlog_spooled(self, authd_api_client, settings, tmp_path):
+        settings.VLOG_SPOOL_DIR = str(tmp_path)
+        data = "2020-01-23 00:00:00.399,101,6,0600A10500"
+        url = reverse("api:vlog-list", kwargs={"version": "v1"})
+        response = authd_api_client.post(url, data, format="txt")
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert Vlog.objects.count() == 0
+        assert [path.read_text() for path in tmp_path.glob("*.vlog")] == [data]
+
     def test_list_vlog(self, authd_api_client):
         url = reverse("api:vlog-list", kwargs={"version": "v1"})
         response = authd_api_client.get(url, format="txt")
@@ -0,0 +1,42 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reistijden_v1.benchmark import PUBLICATION_SITE_TYPES, generate_publication
+from reistijden_v1.consumer import parse_publication
+from reistijden_v1.models import MeasurementSite, Publication
+
+
+class TestReistijdenBenchmark:
+    @pytest.mark.parametrize('publication_type', PUBLICATION_SITE_TYPES)
+    def test_generate_publication(self, publication_type):
+        xml = generate_publication(publication_type, 3, values_per_site=2)
+        data = parse_publication(xml)
+
+        assert data['type'] == publication_type
+        assert len(data['measurements']) == 3
+        site = data['measurements'][0]['measurement_site']
+        assert site['type'] == PUBLICATION_SITE_TYPES[publication_type]
+        values = sum(
+            len(data['measurements'][0][name])
+            for name in ['travel_times', 'individual_travel_times', 'traffic_flows']
+        )
+        assert values == 2
+        # The sites are the same for every publication
+        other_data = parse_publication(
+            generate_publication(publication_type, 3, seed=1)
+        )
+        assert other_data['measurements'][0]['measurement_site'] == site
+        assert generate_publication(publication_type, 3, values_per_site=2) == xml
+
+    @pytest.mark.django_db
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            'benchmark_reistijden', '--messages', '2', '--sites', '3', stdout=out
+        )
+
+        assert 'resolve sites' in out.getvalue()
+        assert Publication.objects.count() == 0
+        assert MeasurementSite.objects.count() == 0
@@ -0,0 +1,21 @@
+from django.test import SimpleTestCase, override_settings
+
+from reistijden_v1.checks import check_parser_engine, check_write_engine
+
+
+class ChecksTest(SimpleTestCase):
+    def test_write_engine(self):
+        self.assertEqual(check_write_engine(None), [])
+
+    @override_settings(REISTIJDEN_WRITE_ENGINE='unknown')
+    def test_unknown_write_engine(self):
+        errors = check_write_engine(None)
+        self.assertEqual([error.id for error in errors], ['reistijden_v1.E001'])
+
+    def test_parser_engine(self):
+        self.assertEqual(check_parser_engine(None), [])
+
+    @override_settings(REISTIJDEN_PARSER_ENGINE='unknown')
+    def test_unknown_parser_engine(self):
+        errors = check_parser_engine(None)
+        self.assertEqual([error.id for error in errors], ['reistijden_v1.E002'])
@@ -1,6 +1,21 @@
+import humps
 import pytest
+import xmltodict
 
-from src.reistijden_v1.parser import ReistijdenParser
+from src.reistijden_v1.management.commands.generate_tag_names import (
+    DEFAULT_XSD_PATH,
+    read_tag_names,
+)
+from src.reistijden_v1.parser import ReistijdenParser, decamelize_item
+from src.reistijden_v1.tag_names import TAG_NAMES
+from tests.reistijden_v1.test_xml import (
+    TEST_POST_EMPTY,
+    TEST_POST_INDIVIDUAL_TRAVEL_TIME,
+    TEST_POST_INDIVIDUAL_TRAVEL_TIME_SINGLE_MEASUREMENT,
+    TEST_POST_TRAFFIC_FLOW,
+    TEST_POST_TRAVEL_TIME,
+    TEST_POST_MISSING_locationContainedInItinerary,
+)
 
 
 class TestReistijdenParser:
@@ -95,3 +110,39 @@ class TestReistijdenParser:
 
         response = parser.get_individual_travel_times_from_measurement(data)
         assert response == expected_data
+
+    @pytest.mark.parametrize(
+        'xml',
+        [
+            TEST_POST_EMPTY,
+            TEST_POST_INDIVIDUAL_TRAVEL_TIME,
+            TEST_POST_INDIVIDUAL_TRAVEL_TIME_SINGLE_MEASUREMENT,
+            TEST_POST_TRAFFIC_FLOW,
+            TEST_POST_TRAVEL_TIME,
+            TEST_POST_MISSING_locationContainedInItinerary,
+        ],
+    )
+    def test_iterparse(self, xml):
+        def restructure_data(engine):
+            data = ReistijdenParser(xml, engine=engine).restructure_data()
+            # The measurement site refers to itself
+            for measurement in data['measurements']:
+                measurement['measurement_site'].pop('measurement_site_json')
+            return data
+
+        assert restructure_data('iterparse') == restructure_data('xmltodict')
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError, match='Unknown parser engine'):
+            ReistijdenParser(TEST_POST_EMPTY, engine='lxml')
+
+    def test_tag_names_match_xsd(self):
+        assert read_tag_names(DEFAULT_XSD_PATH) == TAG_NAMES
+
+    @pytest.mark.parametrize(
+        'xml', [TEST_POST_INDIVIDUAL_TRAVEL_TIME, TEST_POST_TRAFFIC_FLOW]
+    )
+    def test_decamelize_item(self, xml):
+        xml = xml.strip()
+        expected = humps.decamelize(xmltodict.parse(xml))
+        assert xmltodict.parse(xml, postprocessor=decamelize_item) == expected
@@ -1,15 +1,21 @@
+import gzip
 from unittest.mock import patch
 
 from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from ingress.models import Collection, FailedMessage, Message
 from rest_framework.test import APITestCase
 
+from reistijden_v1.cache import measurement_site_cache
 from reistijden_v1.consumer import ReistijdenConsumer
 from reistijden_v1.models import (
     IndividualTravelTime,
     Lane,
     Measurement,
     MeasurementLocation,
+    MeasurementSite,
     Publication,
     TrafficFlow,
     TrafficFlowCategoryCount,
@@ -35,6 +41,11 @@ class ReistijdenPostTestBase(APITestCase):
         Collection.objects.get_or_create(name='reistijden_v1', consumer_enabled=True)
         self.URL = '/ingress/reistijden_v1/'
 
+    def post(self, *xmls):
+        for xml in xmls:
+            response = self.client.post(self.URL, xml, **REQUEST_HEADERS)
+            self.assertEqual(response.status_code, 200, response.data)
+
 
 def reraise_current_exception(*_):
     raise
@@ -158,6 +169,48 @@ class ReistijdenPostTest(ReistijdenPostTestBase):
         self.assertEqual(TrafficFlow.objects.all().count(), 0)
         self.assertEqual(TrafficFlowCategoryCount.objects.all().count(), 0)
 
+    def test_consume_bulk_inserts(self):
+        response = self.client.post(
+            self.URL, TEST_POST_INDIVIDUAL_TRAVEL_TIME, **REQUEST_HEADERS
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+
+        with CaptureQueriesContext(connection) as context:
+            ReistijdenConsumer().consume(end_at_empty_queue=True)
+
+        self.assertGreater(IndividualTravelTime.objects.count(), 1)
+        inserts = [
+            query['sql']
+            for query in context.captured_queries
+            if query['sql'].startswith(
+                'INSERT INTO "reistijden_v1_individualtraveltime"'
+            )
+        ]
+        self.assertEqual(len(inserts), 1)
+
+    def test_post_gzipped_travel_time(self):
+        response = self.client.post(
+            self.URL,
+            gzip.compress(TEST_POST_TRAVEL_TIME.encode()),
+            HTTP_CONTENT_ENCODING='gzip',
+            **REQUEST_HEADERS,
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Message.objects.get().raw_data, TEST_POST_TRAVEL_TIME)
+
+        ReistijdenConsumer().consume(end_at_empty_queue=True)
+        self.assertEqual(Publication.objects.count(), 1)
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=1000)
+    def test_post_gzipped_too_big(self):
+        body = gzip.compress(TEST_POST_TRAVEL_TIME.encode())
+        self.assertLess(len(body), 1000)
+        response = self.client.post(
+            self.URL, body, HTTP_CONTENT_ENCODING='gzip', **REQUEST_HEADERS
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Message.objects.count(), 0)
+
     def test_post_fails_without_token(self):
         response = self.client.post(
             self.URL, TEST_POST_TRAVEL_TIME, **CONTENT_TYPE_HEADER
@@ -165,6 +218,52 @@ class ReistijdenPostTest(ReistijdenPostTestBase):
         self.assertEqual(response.status_code, 401, response.data)
 
 
+@override_settings(REISTIJDEN_WRITE_ENGINE='copy')
+class ReistijdenCopyEnginePostTest(ReistijdenPostTest):
+    """
+    Runs the tests above with the COPY write engine.
+    """
+
+    def consume_rows(self, xml, engine):
+        """
+        Consume the xml with the engine, and return the rows that were created
+        below the measurements, referring to a measurement by its position.
+        """
+        self.client.post(self.URL, xml, **REQUEST_HEADERS)
+        with self.settings(REISTIJDEN_WRITE_ENGINE=engine):
+            ReistijdenConsumer().consume(end_at_empty_queue=True)
+
+        positions = {
+            pk: position
+            for position, pk in enumerate(
+                Measurement.objects.order_by('id').values_list('id', flat=True)
+            )
+        }
+        tables = []
+        for model, fields in [
+            (TravelTime, ['measurement', 'type', 'travel_time', 'data_error']),
+            (IndividualTravelTime, ['measurement', 'license_plate', 'travel_time']),
+            (TrafficFlow, ['measurement', 'specific_lane', 'vehicle_flow']),
+            (TrafficFlowCategoryCount, ['traffic_flow__measurement', 'count', 'type']),
+        ]:
+            rows = [
+                (positions[measurement], *values)
+                for measurement, *values in model.objects.values_list(*fields)
+            ]
+            tables.append(sorted(rows, key=repr))
+        Publication.objects.all().delete()
+        return tables
+
+    def test_same_rows_as_orm_engine(self):
+        for xml in [
+            TEST_POST_TRAVEL_TIME,
+            TEST_POST_INDIVIDUAL_TRAVEL_TIME,
+            TEST_POST_TRAFFIC_FLOW,
+        ]:
+            orm_rows = self.consume_rows(xml, 'orm')
+            self.assertEqual(orm_rows, self.consume_rows(xml, 'copy'))
+
+
 class ReistijdenPostErrorsTest(ReistijdenPostTestBase):
     def test_expaterror(self):
         response = self.client.post(self.URL, TEST_POST_WRONG_TAGS, **REQUEST_HEADERS)
@@ -215,3 +314,123 @@ class ReistijdenPostErrorsTest(ReistijdenPostTestBase):
         ReistijdenConsumer().consume(end_at_empty_queue=True)
         self.assertEqual(Message.objects.count(), 0)
         self.assertEqual(FailedMessage.objects.count(), 1)
+
+
+@override_settings(REISTIJDEN_CONSUME_BATCH_SIZE=10)
+class ReistijdenBatchConsumeTest(ReistijdenPostTestBase):
+    def test_consume_batch(self):
+        self.post(TEST_POST_TRAVEL_TIME, TEST_POST_TRAVEL_TIME, TEST_POST_TRAFFIC_FLOW)
+
+        with patch.object(
+            ReistijdenConsumer,
+            'consume_batch',
+            wraps=ReistijdenConsumer().consume_batch,
+        ) as consume_batch:
+            ReistijdenConsumer().consume(end_at_empty_queue=True)
+
+        consume_batch.assert_called_once()
+        self.assertEqual(Message.objects.count(), 0)
+        self.assertEqual(Publication.objects.count(), 3)
+        self.assertEqual(Measurement.objects.count(), 7)
+        # The second travel time publication shares its sites with the first
+        self.assertEqual(MeasurementSite.objects.count(), 5)
+
+    def test_failing_message_is_isolated(self):
+        self.post(TEST_POST_TRAVEL_TIME, TEST_POST_WRONG_TAGS, TEST_POST_TRAFFIC_FLOW)
+
+        ReistijdenConsumer().consume(end_at_empty_queue=True)
+
+        self.assertEqual(Message.objects.count(), 0)
+        self.assertEqual(FailedMessage.objects.count(), 1)
+        self.assertEqual(Publication.objects.count(), 2)
+
+
+@override_settings(REISTIJDEN_PARSE_WORKERS=2)
+class ReistijdenPipelinedConsumeTest(ReistijdenPostTestBase):
+    def test_consume_pipelined(self):
+        self.post(TEST_POST_TRAVEL_TIME, TEST_POST_WRONG_TAGS, TEST_POST_TRAFFIC_FLOW)
+
+        ReistijdenConsumer().consume(end_at_empty_queue=True)
+
+        self.assertEqual(Message.objects.count(), 0)
+        self.assertEqual(FailedMessage.objects.count(), 1)
+        self.assertIn(
+            'not well-formed (invalid token)',
+            FailedMessage.objects.get().consume_fail_info,
+        )
+        self.assertEqual(
+            list(Publication.objects.order_by('id').values_list('type', flat=True)),
+            ['travelTime', 'trafficFlow'],
+        )
+
+
+@override_settings(REISTIJDEN_PARSE_WORKERS=2, REISTIJDEN_CONSUME_BATCH_SIZE=10)
+class ReistijdenPipelinedBatchConsumeTest(ReistijdenPostTestBase):
+    def test_consume_pipelined_batch(self):
+        self.post(TEST_POST_TRAVEL_TIME, TEST_POST_TRAVEL_TIME, TEST_POST_TRAFFIC_FLOW)
+
+        with patch.object(
+            ReistijdenConsumer,
+            'consume_batch',
+            wraps=ReistijdenConsumer().consume_batch,
+        ) as consume_batch:
+            ReistijdenConsumer().consume(end_at_empty_queue=True)
+
+        consume_batch.assert_called_once()
+        self.assertEqual(Message.objects.count(), 0)
+        self.assertEqual(Publication.objects.count(), 3)
+
+    def test_failing_message_is_isolated(self):
+        self.post(TEST_POST_TRAVEL_TIME, TEST_POST_WRONG_TAGS, TEST_POST_TRAFFIC_FLOW)
+
+        ReistijdenConsumer().consume(end_at_empty_queue=True)
+
+        self.assertEqual(Message.objects.count(), 0)
+        self.assertEqual(FailedMessage.objects.count(), 1)
+        self.assertEqual(
+            list(Publication.objects.order_by('id').values_list('type', flat=True)),
+            ['travelTime', 'trafficFlow'],
+        )
+
+
+class ReistijdenDeletedSiteConsumeTest(ReistijdenPostTestBase):
+    def setUp(self):
+        super().setUp()
+        measurement_site_cache.clear()
+        self.addCleanup(measurement_site_cache.clear)
+
+    def test_site_deleted_by_other_process(self):
+        self.post(TEST_POST_TRAVEL_TIME)
+        # The sites are cached when the transaction is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            ReistijdenConsumer().consume(end_at_empty_queue=True)
+        cached = dict(measurement_site_cache.sites)
+        self.assertEqual(len(cached), 2)
+
+        MeasurementSite.objects.all().delete()
+        # Another process does not receive the post_delete signal
+        for key, site in cached.items():
+            measurement_site_cache.put(key, site)
+
+        self.post(TEST_POST_TRAVEL_TIME, TEST_POST_TRAVEL_TIME)
+        ReistijdenConsumer().consume(end_at_empty_queue=True)
+
+        self.assertEqual(FailedMessage.objects.count(), 0)
+        self.assertEqual(Publication.objects.count(), 3)
+        self.assertEqual(Measurement.objects.count(), 4)
+        self.assertEqual(MeasurementSite.objects.count(), 2)
+        self.assertEqual(measurement_site_cache.sites, {})
+
+
+@override_settings(REISTIJDEN_CONSUME_BATCH_SIZE=10)
+class ReistijdenDeletedSiteBatchConsumeTest(ReistijdenDeletedSiteConsumeTest):
+    """
+    Runs the tests above, consuming the messages in batches.
+    """
+
+
+@override_settings(REISTIJDEN_PARSE_WORKERS=2)
+class ReistijdenDeletedSitePipelinedConsumeTest(ReistijdenDeletedSiteConsumeTest):
+    """
+    Runs the tests above, parsing the messages in a pool of processes.
+    """
@@ -1,8 +1,12 @@
+import copy
 from datetime import datetime
 
 import pytest
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
+from reistijden_v1.cache import measurement_site_cache
 from reistijden_v1.models import Camera, Lane, MeasurementLocation, MeasurementSite
 
 
@@ -369,3 +373,123 @@ class MeasurementSiteTest(TestCase):
             ],
         }
         self._measurement_site_test(before, after, expect_new=False)
+
+    def test_measurement_site_is_identified_by_hash(self):
+        site, _ = MeasurementSite.get_or_create(
+            self.BASE_MEASUREMENT_SITE, datetime.now()
+        )
+        site.refresh_from_db()
+        self.assertEqual(
+            site.measurement_site_hash,
+            MeasurementSite.hash_json(site.measurement_site_json),
+        )
+        self.assertEqual(len(site.measurement_site_hash), 64)
+
+    def test_new_measurement_site_is_created_with_bulk_inserts(self):
+        site = copy.deepcopy(self.BASE_MEASUREMENT_SITE)
+        lanes = site['measurement_locations'][0]['lanes']
+        lanes.append({**lanes[0], 'specific_lane': '-2'})
+
+        with CaptureQueriesContext(connection) as context:
+            _, created = MeasurementSite.get_or_create(site, datetime.now())
+        self.assertTrue(created)
+        # One lookup, and one insert for each model
+        self.assertEqual(len(context.captured_queries), 5)
+        self.assertEqual(Lane.objects.count(), 2)
+        self.assertEqual(Camera.objects.count(), 2)
+
+    def test_insert_many_skips_existing_sites(self):
+        existing_site, _ = MeasurementSite.get_or_create(
+            self.BASE_MEASUREMENT_SITE, datetime.now()
+        )
+        sites = [
+            MeasurementSite.from_json(
+                MeasurementSite.canonicalize_json(site_json), datetime.now()
+            )
+            for site_json in [
+                self.BASE_MEASUREMENT_SITE,
+                {**self.BASE_MEASUREMENT_SITE, 'name': 'other'},
+            ]
+        ]
+
+        inserted = MeasurementSite.insert_many(sites)
+        self.assertEqual(inserted, [sites[1]])
+        self.assertIsNone(sites[0].id)
+        self.assertNotEqual(sites[1].id, existing_site.id)
+        self.assertEqual(MeasurementSite.objects.count(), 2)
+
+    def test_get_or_create_many(self):
+        site = self.BASE_MEASUREMENT_SITE
+        other_site = {**site, 'name': 'other'}
+        existing_site, _ = MeasurementSite.get_or_create(site, datetime.now())
+
+        with CaptureQueriesContext(connection) as context:
+            sites = MeasurementSite.get_or_create_many(
+                [other_site, site, other_site], datetime.now()
+            )
+        # One lookup, and one insert for each model
+        self.assertEqual(len(context.captured_queries), 5)
+        self.assertEqual(sites[0], sites[2])
+        self.assertEqual(sites[1], existing_site)
+        self.assertEqual(MeasurementSite.objects.count(), 2)
+        self.assertEqual(MeasurementLocation.objects.count(), 2)
+        self.assertEqual(Lane.objects.count(), 2)
+        self.assertEqual(Camera.objects.count(), 2)
+        self.assertEqual(
+            list(sites[0].measurementlocation_set.values('index')), [{'index': 1}]
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(
+                MeasurementSite.get_or_create_many([site, other_site], datetime.now()),
+                sites[1:],
+            )
+        self.assertEqual(len(context.captured_queries), 1)
+
+
+@pytest.mark.django_db
+class MeasurementSiteCacheTest(TestCase):
+    SITE = MeasurementSiteTest.BASE_MEASUREMENT_SITE
+
+    def setUp(self):
+        measurement_site_cache.clear()
+        self.addCleanup(measurement_site_cache.clear)
+
+    def get_or_create(self, measurement_site_json=SITE):
+        # The cache is updated when the transaction is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            return MeasurementSite.get_or_create(measurement_site_json, datetime.now())
+
+    def test_cached_site_does_not_query(self):
+        site, created = self.get_or_create()
+        self.assertTrue(created)
+
+        with CaptureQueriesContext(connection) as context:
+            cached_site, created = self.get_or_create()
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(cached_site.id, site.id)
+        self.assertFalse(created)
+
+    def test_rolled_back_site_is_not_cached(self):
+        MeasurementSite.get_or_create(self.SITE, datetime.now())
+        self.assertEqual(measurement_site_cache.sites, {})
+
+    def test_deleted_site_is_evicted(self):
+        site, _ = self.get_or_create()
+        site.delete()
+        self.assertEqual(measurement_site_cache.sites, {})
+
+        new_site, created = self.get_or_create()
+        self.assertTrue(created)
+        self.assertNotEqual(new_site.id, site.id)
+
+    @override_settings(REISTIJDEN_SITE_CACHE_SIZE=1)
+    def test_least_recently_used_site_is_evicted(self):
+        other_site = {**self.SITE, 'name': 'other'}
+        self.get_or_create()
+        self.get_or_create(other_site)
+        self.assertEqual(len(measurement_site_cache.sites), 1)
+
+        with CaptureQueriesContext(connection) as context:
+            self.get_or_create(other_site)
+        self.assertEqual(len(context.captured_queries), 0)
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from ingress.models import Collection, FailedMessage
+
+from reistijden_v1.models import Publication
+from tests.reistijden_v1.test_xml import (
+    TEST_POST_TRAFFIC_FLOW,
+    TEST_POST_TRAVEL_TIME,
+    TEST_POST_WRONG_TAGS,
+)
+
+
+class ReplayFailedMessagesTest(TestCase):
+    def setUp(self):
+        collection, _ = Collection.objects.get_or_create(name='reistijden_v1')
+        for raw_data, fail_info in [
+            (TEST_POST_TRAVEL_TIME, 'OperationalError: connection refused'),
+            (TEST_POST_WRONG_TAGS, 'ExpatError: not well-formed'),
+            (TEST_POST_TRAFFIC_FLOW, 'OperationalError: connection refused'),
+        ]:
+            FailedMessage.objects.create(
+                collection=collection,
+                raw_data=raw_data,
+                consume_failed_at=timezone.now(),
+                consume_fail_info=fail_info,
+            )
+
+    def replay(self, *args):
+        out = StringIO()
+        call_command(
+            'replay_failed_messages',
+            '--workers',
+            '2',
+            '--batch-size',
+            '2',
+            *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_replay(self):
+        output = self.replay()
+
+        self.assertIn('3/3 messages | 2 replayed | 1 failed', output)
+        self.assertEqual(Publication.objects.count(), 2)
+        failed_message = FailedMessage.objects.get()
+        self.assertEqual(failed_message.raw_data, TEST_POST_WRONG_TAGS)
+        self.assertIn(
+            'not well-formed (invalid token)',
+            failed_message.consume_fail_info,
+        )
+
+    def test_filter_by_error(self):
+        output = self.replay('--error', 'ExpatError')
+
+        self.assertIn('1 failed messages to replay', output)
+        self.assertEqual(Publication.objects.count(), 0)
+        self.assertEqual(FailedMessage.objects.count(), 3)
+
+    def test_filter_by_time_window(self):
+        output = self.replay(
+            '--until', (timezone.now() - timedelta(hours=1)).isoformat()
+        )
+
+        self.assertIn('0 failed messages to replay', output)
+        self.assertEqual(FailedMessage.objects.count(), 3)
+
+    def test_dry_run(self):
+        output = self.replay('--dry-run')
+
+        self.assertEqual(output, '3 failed messages to replay\n')
+        self.assertEqual(FailedMessage.objects.count(), 3)
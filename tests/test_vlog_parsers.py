@@ -15,12 +15,13 @@ class TestVlogParser:
 
     def test_timezone_default(self):
         line = parse_vlog_line('2020-02-23 14:00:00.399,102,6,0600A10500')
-        assert line['time'].isoformat() == '2020-02-23T14:00:00.399000+00:00'
+        assert line['time'].isoformat() == '2020-02-23T13:00:00.399000+00:00'
 
     @override_settings(TIME_ZONE='UTC')
     def test_timezone_utc(self):
+        # V-Log times are CET/CEST, regardless of the TIME_ZONE setting
         line = parse_vlog_line('2020-02-23 14:00:00.399,102,6,0600A10500')
-        assert line['time'].isoformat() == '2020-02-23T14:00:00.399000+00:00'
+        assert line['time'].isoformat() == '2020-02-23T13:00:00.399000+00:00'
 
     @override_settings(TIME_ZONE='CET')
     def test_timezone_cet(self):
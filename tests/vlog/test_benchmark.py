@@ -0,0 +1,30 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from vlog.benchmark import generate_vlog_lines
+from vlog.columnar import parse_vlog_columns
+from vlog.decoders import decode_vlog_columns
+from vlog.models import Vlog
+
+
+class TestVlogBenchmark:
+    def test_generate_vlog_lines(self):
+        lines = generate_vlog_lines(100, vri_count=3, message_mix={6: 1, 10: 1})
+        columns = parse_vlog_columns(lines)
+
+        assert len(columns.time) == 100
+        assert columns.errors == {}
+        assert set(columns.vri_id.tolist()) == {1, 2, 3}
+        assert set(columns.message_type.tolist()) == {6, 10}
+        assert sum(len(decoded['time']) for _, decoded in decode_vlog_columns(columns))
+        assert generate_vlog_lines(10) == generate_vlog_lines(10)
+
+    @pytest.mark.django_db
+    def test_command(self):
+        out = StringIO()
+        call_command('benchmark_vlog', '--batch-size', '10', stdout=out)
+
+        assert 'bulk_create' in out.getvalue()
+        assert Vlog.objects.count() == 0
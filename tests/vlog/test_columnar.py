@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from vlog.columnar import parse_vlog_columns
+from vlog.parsers import parse_vlog_lines
+
+
+class TestVlogColumnarParser:
+    def test_same_as_parse_vlog_lines(self):
+        data = """
+            2020-01-23 00:00:00.399 ,101, 6, 0600A10500
+            2020-01-23 00:00:02.220,102 ,10,0A0171010063
+
+            2020-03-29 03:00:02.941, 103,10,0A06120C0060160061
+            2020-10-25 01:00:03.521, 101 , 10, 0A0281010465
+            2020-1-23 00:00,101,6,0600A10500
+            2020-01-23T00:00:02.220+00:00,101,6,0600A10500
+        """
+        columns = parse_vlog_columns(data.splitlines())
+        lines = parse_vlog_lines(data)
+
+        assert columns.line_number.tolist() == [2, 3, 5, 6, 7, 8]
+        assert columns.vri_id.dtype == np.int32
+        assert columns.message_type.dtype == np.int16
+        assert columns.time.tolist() == [
+            line['time'].replace(tzinfo=None) for line in lines
+        ]
+        assert columns.vri_id.tolist() == [line['vri_id'] for line in lines]
+        assert columns.message_type.tolist() == [line['message_type'] for line in lines]
+        assert columns.message.tolist() == [line['message'] for line in lines]
+        assert columns.errors == {}
+
+    def test_skip_unparsable_lines(self):
+        lines = [
+            '2020-08-23 14:00:00.399,102,6,0600A10500',
+            '2020-08-23 14:00:00.399,xxx,6,0600A10500',
+            '2020-08-23 14:00:00.399,102,6',
+            '2020-02-30 14:00:00.399,102,6,0600A10500',
+            'yesterday,102,6,0600A10500',
+            '2020-08-23 14:00:01.399,103,6,0600A10500',
+        ]
+        columns = parse_vlog_columns(lines, start=11)
+        assert columns.line_number.tolist() == [11, 16]
+        assert columns.vri_id.tolist() == [102, 103]
+
+    def test_strict(self):
+        lines = [
+            '2020-08-23 14:00:00.399,102,6,0600A10500',
+            '2020-08-23 14:00:00.399,102,x,0600A10500',
+        ]
+        with pytest.raises(ValueError):
+            parse_vlog_columns(lines, strict=True)
+
+    def test_errors(self):
+        lines = [
+            '2020-08-23 14:00:00.399,102,6,0600A10500',
+            '2020-08-23 14:00:00.399,3000000000,6,0600A10500',
+            '2020-08-23 14:00:00.399,102,40000,0600A10500',
+            '2020-08-23 14:00:00.399,102,-1,' + 'A' * 256,
+            '2020-08-23 14:00:00.399,102,6,0600A1050',
+            '2020-08-23 14:00:00.399,102,6,',
+            '2020-08-23 14:00:00.399,102,256,0600A10500',
+        ]
+        columns = parse_vlog_columns(lines)
+        assert columns.line_number.tolist() == [1, 7]
+        assert columns.message_type.tolist() == [6, 256]
+        assert set(columns.errors) == {2, 3, 4, 5, 6}
+        assert list(columns.errors[2]) == ['vri_id']
+        assert list(columns.errors[3]) == ['message_type']
+        assert list(columns.errors[4]) == ['message_type', 'message']
+        assert columns.errors[5] == {
+            'message': ['Enter an even number of hexadecimal characters.']
+        }
+        assert columns.errors[6] == {'message': ['This field may not be blank.']}
+
+    def test_empty(self):
+        columns = parse_vlog_columns(['', '  '])
+        assert len(columns.time) == 0
+        assert columns.errors == {}
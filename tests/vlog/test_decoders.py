@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from vlog.columnar import parse_vlog_columns
+from vlog.decoders import decode_vlog_columns, store_decoded_messages
+from vlog.models import DetectorState, SignalGroupState
+
+LINES = [
+    '2020-01-23 00:00:00.399,101,6,0600A10500',
+    '2020-01-23 00:00:02.220,102,10,0A0171010063',
+    '2020-01-23 00:00:02.941,103,10,0A06120C0060160061',
+    '2020-01-23 00:00:03.521,101,10,0A0281010465',
+    # The number of entries does not match the length
+    '2020-01-23 00:00:03.600,101,10,0A0282010465',
+    '2020-01-23 00:00:03.700,101,5,0500',
+]
+
+
+class TestVlogDecoders:
+    def test_decode(self):
+        decoded = dict(decode_vlog_columns(parse_vlog_columns(LINES)))
+
+        detector_states = decoded[DetectorState]
+        assert detector_states['vri_id'].tolist() == [101]
+        assert detector_states['time_delta'].tolist() == [10]
+        assert detector_states['detector'].tolist() == [5]
+        assert detector_states['state'].tolist() == [0]
+
+        signal_group_states = decoded[SignalGroupState]
+        assert signal_group_states['vri_id'].tolist() == [102, 101, 103, 103]
+        assert signal_group_states['time_delta'].tolist() == [23, 40, 97, 97]
+        assert signal_group_states['signal_group'].tolist() == [1, 1, 12, 22]
+        assert signal_group_states['state'].tolist() == [0x63, 0x465, 0x60, 0x61]
+        assert signal_group_states['time'][2] == np.datetime64(
+            '2020-01-22T23:00:02.941'
+        )
+
+    @pytest.mark.django_db
+    def test_store(self):
+        columns = parse_vlog_columns(LINES)
+        results = store_decoded_messages(columns)
+        assert results['vlog_detectorstate'].created == 1
+        assert results['vlog_signalgroupstate'].created == 4
+
+        results = store_decoded_messages(columns)
+        assert results['vlog_signalgroupstate'].duplicates == 4
+        assert DetectorState.objects.get().detector == 5
+        assert SignalGroupState.objects.count() == 4
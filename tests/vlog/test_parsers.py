@@ -2,7 +2,15 @@ import pytest
 import pytz
 from django.test import override_settings
 
-from vlog.parsers import parse_vlog_line, parse_vlog_lines
+from contrib.concurrent.futures import get_executor, map_in_processes
+from vlog.parsers import (
+    chunked,
+    iter_vlog_lines,
+    parse_vlog_chunk,
+    parse_vlog_line,
+    parse_vlog_lines,
+    parse_vlog_time,
+)
 
 
 class TestVlogParser:
@@ -15,12 +23,13 @@ class TestVlogParser:
 
     def test_timezone_default(self):
         line = parse_vlog_line('2020-02-23 14:00:00.399,102,6,0600A10500')
-        assert line['time'].isoformat() == '2020-02-23T14:00:00.399000+00:00'
+        assert line['time'].isoformat() == '2020-02-23T13:00:00.399000+00:00'
 
     @override_settings(TIME_ZONE='UTC')
     def test_timezone_utc(self):
+        # V-Log times are CET/CEST, regardless of the TIME_ZONE setting
         line = parse_vlog_line('2020-02-23 14:00:00.399,102,6,0600A10500')
-        assert line['time'].isoformat() == '2020-02-23T14:00:00.399000+00:00'
+        assert line['time'].isoformat() == '2020-02-23T13:00:00.399000+00:00'
 
     @override_settings(TIME_ZONE='CET')
     def test_timezone_cet(self):
@@ -32,6 +41,24 @@ class TestVlogParser:
         line = parse_vlog_line('2020-08-23 14:00:00.399,102,6,0600A10500')
         assert line['time'].isoformat() == '2020-08-23T12:00:00.399000+00:00'
 
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ('2020-03-29 01:59:59.999', '2020-03-29T00:59:59.999000+00:00'),
+            ('2020-03-29 03:00:00.000', '2020-03-29T01:00:00+00:00'),
+            ('2020-10-25 01:59:59.999', '2020-10-24T23:59:59.999000+00:00'),
+            ('2020-10-25 03:00:00.000', '2020-10-25T02:00:00+00:00'),
+            # Non canonical formats are handled by dateutil
+            ('2020-1-23 00:00', '2020-01-22T23:00:00+00:00'),
+            ('2020-01-23 00:00:02.22', '2020-01-22T23:00:02.220000+00:00'),
+            ('2020-01-23T00:00:02.220+00:00', '2020-01-23T00:00:02.220000+00:00'),
+        ],
+    )
+    def test_parse_vlog_time(self, value, expected):
+        date = parse_vlog_time(value)
+        assert date.tzinfo == pytz.utc
+        assert date.isoformat() == expected
+
     @pytest.mark.parametrize("separator", [',', ' , ', ', ', ' ,'])
     @pytest.mark.parametrize("newlines", ['\n', '\r', '\r\n'])
     def test_multiple_lines(self, newlines, separator):
@@ -101,3 +128,45 @@ class TestVlogParser:
 
         lines = parse_vlog_lines(data, strict=False)
         assert len(lines) == 3
+
+    def test_iter_vlog_lines(self):
+        lines = iter_vlog_lines(
+            [
+                ' 2020-08-23 14:00:00.399,102,6,0600A10500 ',
+                '',
+                '2020-08-23 14:00:00.399,xxx,6,0600A10500',
+                '2020-08-23 14:00:01.399,103,6,0600A10500',
+            ]
+        )
+        assert [line['vri_id'] for line in lines] == [102, 103]
+
+    def test_chunked(self):
+        assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+        assert list(chunked([], 2)) == []
+
+    def test_map_in_processes(self):
+        lines = [
+            "2020-01-23 00:00:00.399,101,6,0600A10500",
+            "2020-01-23 00:00:02.220,102,10,0A0171010063",
+            "2020-01-23 00:00:02.941,103,10,0A06120C0060160061",
+        ]
+        chunks = chunked(lines, 1)
+        result = map_in_processes(parse_vlog_chunk, chunks, workers=2)
+        assert [row for chunk in result for row in chunk] == parse_vlog_lines(
+            "\n".join(lines)
+        )
+
+    def test_map_in_processes_close(self):
+        lines = ["2020-01-23 00:00:00.399,101,6,0600A10500"] * 20
+        chunks = chunked(lines, 1)
+        result = map_in_processes(parse_vlog_chunk, chunks, workers=2)
+        assert next(result) == parse_vlog_lines(lines[0])
+        executor = get_executor(2)
+        result.close()
+
+        # At most two chunks per worker were submitted, the pool is reused
+        assert len(list(chunks)) >= len(lines) - 5
+        assert list(map_in_processes(parse_vlog_chunk, [lines[:1]], workers=2)) == [
+            parse_vlog_lines(lines[0])
+        ]
+        assert get_executor(2) is executor
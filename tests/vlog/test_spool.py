@@ -0,0 +1,62 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from vlog.models import Vlog
+from vlog.spool import drain_spool, spool_body, spooled_files
+
+
+@pytest.mark.django_db
+class TestVlogSpool:
+    def test_drain(self, tmp_path):
+        first = spool_body(
+            io.BytesIO(
+                b"2020-01-23 00:00:00.399,101,6,0600A10500\n"
+                b"2020-01-23 00:00:02.220,102,10,0A0171010063\n"
+            ),
+            tmp_path,
+        )
+        second = spool_body(
+            io.BytesIO(b"2020-01-23 00:00:03.521,103,10,0A0281010465"), tmp_path
+        )
+        assert spooled_files(tmp_path) == [first, second]
+
+        assert drain_spool(tmp_path, chunk_size=1) == 3
+        assert sorted(Vlog.objects.values_list("vri_id", flat=True)) == [101, 102, 103]
+        assert spooled_files(tmp_path) == []
+
+    def test_spool_interrupted_body(self, tmp_path):
+        class InterruptedStream(io.BytesIO):
+            def read(self, *args):
+                if self.tell():
+                    raise OSError("Connection reset")
+                return super().read(*args)
+
+        stream = InterruptedStream(b"2020-01-23 00:00:00.399,101,6,0600A10500\n")
+        with pytest.raises(OSError):
+            spool_body(stream, tmp_path)
+
+        assert spooled_files(tmp_path) == []
+        assert list((tmp_path / "tmp").iterdir()) == []
+
+    def test_drain_invalid_file(self, tmp_path):
+        path = spool_body(
+            io.BytesIO(
+                b"2020-01-23 00:00:00.399,101,6,0600A10500\n"
+                b"2020-01-23 00:00:02.220,102,40000,0A0171010063\n"
+            ),
+            tmp_path,
+        )
+
+        assert drain_spool(tmp_path, chunk_size=10) == 0
+        assert Vlog.objects.count() == 0
+        assert spooled_files(tmp_path) == []
+        assert (tmp_path / "failed" / path.name).exists()
+
+    def test_drain_command(self, settings, tmp_path):
+        settings.VLOG_SPOOL_DIR = str(tmp_path)
+        spool_body(io.BytesIO(b"2020-01-23 00:00:00.399,101,6,0600A10500"), tmp_path)
+
+        call_command("drain_vlog_spool", "--once")
+        assert Vlog.objects.count() == 1